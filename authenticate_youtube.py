@@ -1,44 +1,77 @@
 import os
-import json
+import sys
 import webbrowser
+from datetime import datetime, timezone
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from core.json_io import read_json, write_bytes
+
 # Permisos necesarios para subir y administrar videos
 SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
 
+# Renovar el token si expira dentro de este margen (segundos)
+REFRESH_WINDOW_SECONDS = 300
+
+# Tiempo máximo de espera para completar la autorización en el navegador
+AUTH_TIMEOUT_SECONDS = 180
+
+def token_expires_soon(creds):
+    """
+    Indica si el token expira dentro de REFRESH_WINDOW_SECONDS,
+    para renovarlo antes de la primera llamada a la API.
+    """
+    if not creds.expiry:
+        return False
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return (creds.expiry - now).total_seconds() < REFRESH_WINDOW_SECONDS
+
 def authenticate_youtube():
     """
     Autentica con YouTube usando OAuth 2.0 y guarda los tokens.
     Retorna las credenciales autenticadas.
     """
     creds = None
+    creds_changed = False
 
     # Si ya hay token guardado
     if os.path.exists('token.json'):
         print("Token existente encontrado, verificando...")
-        creds = Credentials.from_authorized_user_file('token.json', SCOPES)
+        creds = Credentials.from_authorized_user_info(read_json('token.json'), SCOPES)
+
+    expires_soon = bool(creds and creds.refresh_token and token_expires_soon(creds))
+
+    # Si el token expiró o está por expirar, renovarlo
+    if creds and creds.refresh_token and (creds.expired or expires_soon):
+        print("Token expirado o por expirar, renovando...")
+        creds.refresh(Request())
+        creds_changed = True
 
-    # Si no hay token o es inválido
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            print("Token expirado, renovando...")
-            creds.refresh(Request())
-        else:
-            print("Iniciando flujo de autenticacion...")
-            print("Se abrira tu navegador para autorizar la aplicacion")
-            
-            # Usar el archivo de credenciales de cliente
-            flow = InstalledAppFlow.from_client_secrets_file(
-                'client_secret.json', SCOPES)
-            
-            # Ejecutar el servidor local para recibir el código de autorización
-            creds = flow.run_local_server(port=8080, open_browser=True)
+    # Si no hay token o es inválido, iniciar el flujo completo
+    elif not creds or not creds.valid:
+        print("Iniciando flujo de autenticacion...")
+        print("Se abrira tu navegador para autorizar la aplicacion")
+        
+        # Usar el archivo de credenciales de cliente
+        flow = InstalledAppFlow.from_client_secrets_file(
+            'client_secret.json', SCOPES)
+        
+        # Ejecutar el servidor local para recibir el código de autorización.
+        # El navegador lo abre la librería: abrirlo antes con otra URL
+        # generaría un 'state' distinto y la validación fallaría.
+        creds = flow.run_local_server(
+            port=8080,
+            bind_addr='127.0.0.1',
+            open_browser=True,
+            timeout_seconds=AUTH_TIMEOUT_SECONDS
+        )
+        creds_changed = True
 
-        # Guardar el token para uso futuro
-        with open('token.json', 'w') as token_file:
-            token_file.write(creds.to_json())
+    # Guardar el token solo si cambió; con un token vigente no se escribe nada
+    if creds_changed:
+        write_bytes('token.json', creds.to_json().encode('utf-8'))
         print("Token guardado en token.json")
 
     print("Autenticacion completa")
@@ -17,6 +17,7 @@ def create_test_video():
         # Create a simple 5-second video with color bars and text
         cmd = [
             "ffmpeg", "-y",  # -y to overwrite existing file
+            "-loglevel", "error",  # Only report errors, no progress output
             "-f", "lavfi",   # Use libavfilter input
             "-i", "testsrc=duration=5:size=1280x720:rate=30",  # 5s test pattern
             "-f", "lavfi",
@@ -31,14 +32,16 @@ def create_test_video():
         print("Creating test video with FFmpeg...")
         print(f"Command: {' '.join(cmd)}")
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        # stderr is only read back (and decoded) when FFmpeg fails
+        process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        _, stderr = process.communicate()
         
-        if result.returncode == 0:
+        if process.returncode == 0:
             print(f"SUCCESS: Test video created: {output_path}")
             print(f"   File size: {output_path.stat().st_size / 1024 / 1024:.2f} MB")
             return str(output_path)
         else:
-            print(f"ERROR: FFmpeg error: {result.stderr}")
+            print(f"ERROR: FFmpeg error: {stderr.decode('utf-8', errors='replace')}")
             return None
             
     except FileNotFoundError:
@@ -3,47 +3,211 @@
 Script to help get correct Facebook credentials for video posting
 """
 
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from core.json_io import read_json, write_json
+
+GRAPH_URL = "https://graph.facebook.com/v23.0"
+CACHE_PATH = 'credentials/facebook/.debug_cache.json'
+DEBUG_INFO_PATH = 'credentials/facebook/facebook_token.debug.json'
+
+# Drop cached entries this many seconds before the token expires
+SAFETY_MARGIN_SECS = 60
+# Maximum lifetime of cached user/page lookups
+DEFAULT_TTL_SECS = 3600
+MAX_CACHE_ENTRIES = 128
+# Skip /debug_token while the token is valid for at least this long
+DEBUG_RECHECK_SECS = 3600
+
+
+def _token_hash(access_token: str) -> str:
+    return hashlib.sha256(access_token.encode('utf-8')).hexdigest()
+
+
+class TokenCache:
+    """
+    Disk-backed cache of Graph API lookups (user info, managed pages)
+    keyed by access token, so repeated runs with an unchanged token skip the network
+    """
+
+    def __init__(self, path: str = CACHE_PATH):
+        self.path = path
+        self._entries = None
+
+    def _load(self) -> dict:
+        if self._entries is None:
+            try:
+                self._entries = read_json(self.path)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, access_token: str):
+        """Return the cached entry for a token, or None if missing or about to expire"""
+        entries = self._load()
+        entry = entries.get(_token_hash(access_token))
+        if entry is None:
+            return None
+
+        if entry['expires_at'] < time.time() + SAFETY_MARGIN_SECS:
+            return None
+
+        return entry
+
+    def put(self, access_token: str, user_info: dict, pages: list, token_expires_at: int = 0):
+        """Store lookup results for a token and persist the cache"""
+        now = time.time()
+        expires_at = now + DEFAULT_TTL_SECS
+        if token_expires_at:
+            expires_at = min(expires_at, token_expires_at)
+
+        entries = self._load()
+        entries[_token_hash(access_token)] = {
+            'user': user_info,
+            'pages': pages,
+            'expires_at': expires_at
+        }
+
+        # Prune expired entries and keep only the newest ones
+        live = [(k, v) for k, v in entries.items() if v['expires_at'] >= now + SAFETY_MARGIN_SECS]
+        live.sort(key=lambda item: item[1]['expires_at'], reverse=True)
+        self._entries = dict(live[:MAX_CACHE_ENTRIES])
+
+        try:
+            write_json(self.path, self._entries)
+        except OSError as e:
+            print(f"   Warning: could not write cache {self.path}: {e}")
+
+
+def load_debug_info(access_token: str):
+    """
+    Return the token debug info saved by a previous run, or None if it belongs
+    to a different token or the token expires within DEBUG_RECHECK_SECS
+    """
+    try:
+        debug_info = read_json(DEBUG_INFO_PATH)
+    except (OSError, ValueError):
+        return None
+
+    if debug_info.get('token_hash') != _token_hash(access_token):
+        return None
+
+    expires_at = debug_info.get('expires_at') or 0
+    if expires_at - time.time() <= DEBUG_RECHECK_SECS:
+        return None
+
+    return debug_info
+
+
+def save_debug_info(access_token: str, token_info: dict):
+    """Save the fields of a /debug_token response next to facebook_token.json"""
+    debug_info = {
+        'token_hash': _token_hash(access_token),
+        'type': token_info.get('type'),
+        'app_id': token_info.get('app_id'),
+        'is_valid': token_info.get('is_valid', False),
+        'expires_at': token_info.get('expires_at', 0),
+        'scopes': token_info.get('scopes', [])
+    }
+    try:
+        write_json(DEBUG_INFO_PATH, debug_info)
+    except OSError as e:
+        print(f"   Warning: could not write {DEBUG_INFO_PATH}: {e}")
+
+
+def create_session() -> requests.Session:
+    """Create a Graph API session that keeps its connection alive between calls"""
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.2, status_forcelist=(500, 502, 503, 504))
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+    return session
+
+
+def _parse_response(response):
+    """Return (data, error) for a Graph API response"""
+    if response.status_code == 200:
+        return response.json(), None
+    return None, response
+
 
 def get_facebook_credentials():
     """Get correct Facebook credentials from current user token"""
-    
+
     # Load current token
-    with open('credentials/facebook/facebook_token.json', 'r') as f:
-        token_data = json.load(f)
-    
+    token_data = read_json('credentials/facebook/facebook_token.json')
+
     access_token = token_data['access_token']
-    
+
     print("Getting Facebook credentials...")
     print("=" * 40)
-    
+
+    session = create_session()
+
+    token_info, debug_error = load_debug_info(access_token), None
+    cache = TokenCache()
+    cached = cache.get(access_token)
+
+    # The lookups only depend on the access token, so run the ones still needed concurrently
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        debug_future = user_future = pages_future = None
+        if token_info is None:
+            debug_future = executor.submit(
+                session.get,
+                f"{GRAPH_URL}/debug_token",
+                params={
+                    'input_token': access_token,
+                    'access_token': access_token
+                }
+            )
+        if not cached:
+            user_future = executor.submit(
+                session.get,
+                f"{GRAPH_URL}/me",
+                params={'access_token': access_token, 'fields': 'id,name'}
+            )
+            pages_future = executor.submit(
+                session.get,
+                f"{GRAPH_URL}/me/accounts",
+                params={'access_token': access_token}
+            )
+
+    if debug_future is not None:
+        debug_data, debug_error = _parse_response(debug_future.result())
+        token_info = debug_data.get('data', {}) if debug_data else {}
+        if debug_error is None and token_info.get('is_valid'):
+            save_debug_info(access_token, token_info)
+
+    if cached:
+        user_data, user_error = cached['user'], None
+        pages, pages_error = cached['pages'], None
+    else:
+        user_data, user_error = _parse_response(user_future.result())
+        pages_data, pages_error = _parse_response(pages_future.result())
+        pages = pages_data.get('data', []) if pages_data else []
+
+        if not (user_error or pages_error):
+            cache.put(access_token, user_data, pages, token_info.get('expires_at', 0))
+
     # Get user info
     print("\n1. Current User Info:")
-    user_response = requests.get(
-        f"https://graph.facebook.com/v23.0/me",
-        params={'access_token': access_token, 'fields': 'id,name'}
-    )
-    
-    if user_response.status_code == 200:
-        user_data = user_response.json()
+    if user_error is None:
         print(f"   User ID: {user_data.get('id')}")
         print(f"   Name: {user_data.get('name')}")
     else:
-        print(f"   Error: {user_response.status_code} - {user_response.text}")
+        print(f"   Error: {user_error.status_code} - {user_error.text}")
         return
-    
+
     # Get managed pages
     print("\n2. Managed Pages:")
-    pages_response = requests.get(
-        f"https://graph.facebook.com/v23.0/me/accounts",
-        params={'access_token': access_token}
-    )
-    
-    if pages_response.status_code == 200:
-        pages_data = pages_response.json()
-        pages = pages_data.get('data', [])
-        
+    if pages_error is None:
         if pages:
             print(f"   Found {len(pages)} managed page(s):")
             for i, page in enumerate(pages):
@@ -55,49 +219,42 @@ def get_facebook_credentials():
             print("   No managed pages found")
             print("   You need to be an admin of a Facebook page to post videos")
     else:
-        print(f"   Error: {pages_response.status_code} - {pages_response.text}")
-    
+        print(f"   Error: {pages_error.status_code} - {pages_error.text}")
+
     # Get app info (if available)
     print("\n3. App Information:")
     print("   To get your App ID, visit: https://developers.facebook.com/apps/")
     print("   Your app ID should be a numeric value like: 123456789012345")
-    
+
     # Analyze current token type
     print("\n4. Token Analysis:")
-    debug_response = requests.get(
-        f"https://graph.facebook.com/v23.0/debug_token",
-        params={
-            'input_token': access_token,
-            'access_token': access_token
-        }
-    )
-    
-    if debug_response.status_code == 200:
-        debug_data = debug_response.json()
-        token_info = debug_data.get('data', {})
-        print(f"   Token Type: {token_info.get('type', 'Unknown')}")
-        print(f"   App ID: {token_info.get('app_id', 'Unknown')}")
-        print(f"   Valid: {token_info.get('is_valid', False)}")
-        print(f"   Expires: {token_info.get('expires_at', 'Never')}")
-        
+    if debug_error is None:
+        token_type, app_id, is_valid, expires_at = (
+            token_info.get(key) for key in ('type', 'app_id', 'is_valid', 'expires_at')
+        )
+        print(f"   Token Type: {token_type or 'Unknown'}")
+        print(f"   App ID: {app_id or 'Unknown'}")
+        print(f"   Valid: {bool(is_valid)}")
+        print(f"   Expires: {expires_at or 'Never'}")
+
         # Check scopes
-        scopes = token_info.get('scopes', [])
+        scopes = token_info.get('scopes') or []
+        scope_set = set(scopes)
         required_scopes = ['pages_show_list', 'pages_read_engagement', 'pages_manage_posts']
         print(f"\n   Current Scopes: {', '.join(scopes) if scopes else 'None'}")
         print(f"   Required Scopes: {', '.join(required_scopes)}")
-        
-        missing_scopes = [scope for scope in required_scopes if scope not in scopes]
+
+        missing_scopes = [scope for scope in required_scopes if scope not in scope_set]
         if missing_scopes:
             print(f"   Missing Scopes: {', '.join(missing_scopes)}")
         else:
             print("   ✓ All required scopes present")
-            
+
         # Save app_id if found
-        app_id = token_info.get('app_id')
         if app_id:
             print(f"\n   Found App ID: {app_id}")
     else:
-        print(f"   Error debugging token: {debug_response.status_code}")
+        print(f"   Error debugging token: {debug_error.status_code}")
 
 if __name__ == "__main__":
-    get_facebook_credentials()
\ No newline at end of file
+    get_facebook_credentials()
@@ -15,7 +15,10 @@ sys.path.insert(0, str(src_path))
 
 import argparse
 import logging
-from core import PlatformManager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from core import PlatformManager
 
 def setup_logging(verbose: bool = False):
     """Setup logging configuration"""
@@ -25,7 +28,7 @@ def setup_logging(verbose: bool = False):
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
-def list_platforms(manager: PlatformManager):
+def list_platforms(manager: "PlatformManager"):
     """List all available platforms"""
     print("Available Platforms:")
     print("=" * 20)
@@ -37,7 +40,7 @@ def list_platforms(manager: PlatformManager):
     
     print()
 
-def authenticate_platform(manager: PlatformManager, platform: str):
+def authenticate_platform(manager: "PlatformManager", platform: str):
     """Authenticate with a specific platform"""
     print(f"Authenticating with {platform.title()}...")
     
@@ -49,7 +52,7 @@ def authenticate_platform(manager: PlatformManager, platform: str):
     
     return success
 
-def upload_video(manager: PlatformManager, platforms: list, video_path: str, 
+def upload_video(manager: "PlatformManager", platforms: list, video_path: str, 
                 title: str, description: str, **kwargs):
     """Upload video to specified platforms"""
     print(f"Uploading video: {video_path}")
@@ -119,6 +122,9 @@ def main():
     # Setup logging
     setup_logging(args.verbose)
     
+    # Imported here so --help and argument errors don't load the platform stack
+    from core import PlatformManager
+    
     # Initialize platform manager
     print("Initializing MultiPosti...")
     credentials_path = project_root / "credentials"
@@ -127,25 +133,28 @@ def main():
     print()
     
     # Execute command
-    if args.command == 'list':
-        list_platforms(manager)
-    
-    elif args.command == 'auth':
-        authenticate_platform(manager, args.platform)
-    
-    elif args.command == 'upload':
-        # Prepare upload parameters
-        upload_kwargs = {
-            'tags': args.tags or [],
-            'hashtags': args.hashtags or [],
-            'privacy': args.privacy
-        }
+    try:
+        if args.command == 'list':
+            list_platforms(manager)
         
-        upload_video(manager, args.platforms, args.video_path, 
-                    args.title, args.description, **upload_kwargs)
-    
-    elif args.command == 'status':
-        list_platforms(manager)
+        elif args.command == 'auth':
+            authenticate_platform(manager, args.platform)
+        
+        elif args.command == 'upload':
+            # Prepare upload parameters
+            upload_kwargs = {
+                'tags': args.tags or [],
+                'hashtags': args.hashtags or [],
+                'privacy': args.privacy
+            }
+            
+            upload_video(manager, args.platforms, args.video_path, 
+                        args.title, args.description, **upload_kwargs)
+        
+        elif args.command == 'status':
+            list_platforms(manager)
+    finally:
+        manager.close()
 
 if __name__ == '__main__':
     try:
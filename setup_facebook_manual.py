@@ -2,67 +2,90 @@
 """
 Manual Facebook Authentication Setup
 Simple script to help set up Facebook authentication manually
+
+Values can be passed as arguments or environment variables to skip the prompts:
+    python setup_facebook_manual.py --access-token TOKEN --page-id PAGE_ID [--ig-user-id IG_ID]
+    FB_TOKEN=... FB_PAGE_ID=... [FB_IG_USER_ID=...] python setup_facebook_manual.py
 """
 
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from core.json_io import write_json
+
+parser = argparse.ArgumentParser(description="Save a Facebook access token for MultiPosti")
+parser.add_argument('--access-token', default=os.environ.get('FB_TOKEN'),
+                    help='Long-lived user access token (env: FB_TOKEN)')
+parser.add_argument('--page-id', default=os.environ.get('FB_PAGE_ID'),
+                    help='Facebook Page ID (env: FB_PAGE_ID)')
+parser.add_argument('--ig-user-id', default=os.environ.get('FB_IG_USER_ID'),
+                    help='Instagram Business Account ID (env: FB_IG_USER_ID)')
+args = parser.parse_args()
+
 print("Manual Facebook Authentication Setup")
 print("=" * 50)
 
-print("\n1. Go to Facebook Developer Console: https://developers.facebook.com/")
-print("2. Select your app (MultiPosti)")
-print("3. Go to Graph API Explorer: https://developers.facebook.com/tools/explorer/")
+if not (args.access_token and args.page_id):
+    print("\n1. Go to Facebook Developer Console: https://developers.facebook.com/")
+    print("2. Select your app (MultiPosti)")
+    print("3. Go to Graph API Explorer: https://developers.facebook.com/tools/explorer/")
+
+    print("\n4. In Graph API Explorer:")
+    print("   - Select your app from dropdown")
+    print("   - Click 'Generate Access Token'")
+    print("   - Select these permissions:")
+    print("     * pages_manage_posts")
+    print("     * pages_read_engagement")
+    print("     * pages_show_list")
+    print("     * instagram_basic")
+    print("     * instagram_content_publish")
 
-print("\n4. In Graph API Explorer:")
-print("   - Select your app from dropdown")
-print("   - Click 'Generate Access Token'")
-print("   - Select these permissions:")
-print("     * pages_manage_posts")
-print("     * pages_read_engagement") 
-print("     * pages_show_list")
-print("     * instagram_basic")
-print("     * instagram_content_publish")
+    print("\n5. Copy the generated User Access Token")
+    print("6. Go to Access Token Debugger: https://developers.facebook.com/tools/debug/accesstoken/")
+    print("7. Paste your token and click 'Debug'")
+    print("8. Click 'Extend Access Token' to get a long-lived token")
 
-print("\n5. Copy the generated User Access Token")
-print("6. Go to Access Token Debugger: https://developers.facebook.com/tools/debug/accesstoken/")
-print("7. Paste your token and click 'Debug'")
-print("8. Click 'Extend Access Token' to get a long-lived token")
+    print("\n9. Copy the long-lived token and run this:")
+    print("   python setup_facebook_manual.py --access-token YOUR_TOKEN --page-id YOUR_PAGE_ID --ig-user-id YOUR_IG_USER_ID")
 
-print("\n9. Copy the long-lived token and run this:")
-print("   python -c \"import json; token=input('Paste long-lived token: '); print('Token saved!') if open('credentials/facebook/facebook_token.json', 'w').write(json.dumps({'access_token': token, 'page_id': 'YOUR_PAGE_ID', 'ig_user_id': 'YOUR_IG_USER_ID', 'created_at': 1699999999})) else None\"")
+    print("\n10. You'll also need your Page ID and Instagram Business Account ID")
+    print("    Get these from Graph API Explorer by querying '/me/accounts' and '/PAGE_ID?fields=instagram_business_account'")
 
-print("\n10. You'll also need your Page ID and Instagram Business Account ID")
-print("    Get these from Graph API Explorer by querying '/me/accounts' and '/PAGE_ID?fields=instagram_business_account'")
+    print("\nAlternatively, let's try a simpler approach...")
 
-print("\nAlternatively, let's try a simpler approach...")
+    # Simple token update
+    print("\nEnter your details:")
 
-# Simple token update
-print("\nEnter your details:")
 try:
-    access_token = input("Long-lived User Access Token: ")
-    page_id = input("Facebook Page ID: ")
-    ig_user_id = input("Instagram Business Account ID (optional): ")
-    
+    access_token = args.access_token or input("Long-lived User Access Token: ")
+    page_id = args.page_id or input("Facebook Page ID: ")
+    if args.ig_user_id is not None or args.access_token:
+        ig_user_id = args.ig_user_id
+    else:
+        ig_user_id = input("Instagram Business Account ID (optional): ")
+
     if access_token and page_id:
-        import json
-        from pathlib import Path
-        
         token_data = {
             "access_token": access_token,
             "page_id": page_id,
             "ig_user_id": ig_user_id if ig_user_id else None,
-            "created_at": int(time.time()) if 'time' in dir() else 1699999999
+            "created_at": int(time.time())
         }
-        
+
         credentials_dir = Path("credentials/facebook")
         credentials_dir.mkdir(parents=True, exist_ok=True)
-        
+
         token_path = credentials_dir / "facebook_token.json"
-        with open(token_path, 'w') as f:
-            json.dump(token_data, f, indent=2)
-        
+        write_json(token_path, token_data)
+
         print(f"\nCredentials saved to: {token_path}")
         print("You can now test the upload again!")
-        
+
 except KeyboardInterrupt:
     print("\nSetup cancelled.")
 except Exception as e:
-    print(f"\nError: {e}")
\ No newline at end of file
+    print(f"\nError: {e}")
@@ -4,14 +4,18 @@ TikTok Authentication Setup
 Simple script to help set up TikTok authentication
 """
 
-import json
+import os
+import sys
+import time
 import webbrowser
 import urllib.parse
 from pathlib import Path
 from http.server import HTTPServer, BaseHTTPRequestHandler
-import threading
 import requests
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from core.json_io import read_json, write_json
+
 class TikTokOAuthHandler(BaseHTTPRequestHandler):
     """HTTP handler to capture TikTok OAuth callback"""
     
@@ -45,12 +49,28 @@ class TikTokOAuthHandler(BaseHTTPRequestHandler):
             </body></html>
             """
             self.wfile.write(error_html.encode('utf-8'))
-        
-        threading.Thread(target=self.server.shutdown).start()
+        else:
+            # Unrelated request (e.g. favicon), keep waiting for the callback
+            self.send_response(404)
+            self.end_headers()
     
     def log_message(self, format, *args):
         pass
 
+class TikTokOAuthServer(HTTPServer):
+    """Local server that waits for a single TikTok OAuth callback"""
+    
+    # Seconds to wait for the browser before giving up
+    timeout = 300
+    
+    def __init__(self, server_address, handler_class):
+        super().__init__(server_address, handler_class)
+        self.auth_code = None
+        self.auth_error = None
+    
+    def handle_timeout(self):
+        self.auth_error = "Timed out waiting for authorization"
+
 def load_tiktok_credentials():
     """Load TikTok app credentials"""
     creds_path = Path("credentials/tiktok/client_secret.json")
@@ -59,9 +79,7 @@ def load_tiktok_credentials():
         return None
     
     try:
-        with open(creds_path, 'r') as f:
-            creds = json.load(f)
-        return creds
+        return read_json(creds_path)
     except Exception as e:
         print(f"ERROR: Failed to load credentials: {e}")
         return None
@@ -86,23 +104,22 @@ def start_oauth_flow(client_key, redirect_uri):
     webbrowser.open(auth_url_full)
     
     # Start local server to capture callback
-    server = HTTPServer(('localhost', 8080), TikTokOAuthHandler)
-    server.auth_code = None
-    server.auth_error = None
+    server = TikTokOAuthServer(('localhost', 8080), TikTokOAuthHandler)
     
     print("Waiting for TikTok authorization...")
     print("(Complete the authorization in your browser)")
     
-    server.serve_forever()
+    try:
+        while server.auth_code is None and server.auth_error is None:
+            server.handle_request()
+    finally:
+        server.server_close()
     
-    if hasattr(server, 'auth_code') and server.auth_code:
+    if server.auth_code:
         print("Authorization code received!")
         return server.auth_code
-    elif hasattr(server, 'auth_error'):
-        print(f"Authorization failed: {server.auth_error}")
-        return None
     else:
-        print("No authorization code received")
+        print(f"Authorization failed: {server.auth_error}")
         return None
 
 def exchange_code_for_token(client_key, client_secret, auth_code, redirect_uri):
@@ -138,8 +155,11 @@ def save_token(token_data):
         token_path = Path("credentials/tiktok/tiktok_token.json")
         token_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(token_path, 'w') as f:
-            json.dump(token_data, f, indent=2)
+        # Absolute expiry lets TikTokPlatform refresh the token ahead of time
+        if token_data.get('expires_in'):
+            token_data['expires_at'] = time.time() + float(token_data['expires_in'])
+        
+        write_json(token_path, token_data)
         
         print(f"Token saved to: {token_path}")
         return True
@@ -190,7 +210,6 @@ def main():
         return 1
 
 if __name__ == '__main__':
-    import sys
     try:
         sys.exit(main())
     except KeyboardInterrupt:
@@ -1,56 +1,102 @@
 import os
+import sys
 import json
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
+from functools import lru_cache
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from core.json_io import write_bytes
+
+# Las librerias de Google se importan dentro de cada funcion: cargarlas
+# tarda cientos de ms y no todas las rutas las necesitan
 
 # Permisos necesarios para subir y administrar videos
 SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
 
+@lru_cache(maxsize=4)
+def _cached_creds(mtime_ns, path, scopes):
+    """
+    Carga las credenciales desde disco. mtime_ns forma parte de la clave,
+    así que si el archivo cambia se vuelve a leer.
+    """
+    from google.oauth2.credentials import Credentials
+    return Credentials.from_authorized_user_file(path, list(scopes))
+
+def load_credentials(path='token.json'):
+    """
+    Devuelve las credenciales guardadas en `path`, reutilizando las ya
+    cargadas mientras el archivo no se modifique
+    """
+    st = os.stat(path)
+    return _cached_creds(st.st_mtime_ns, path, tuple(SCOPES))
+
+def _emit(lines):
+    """
+    Escribe un bloque de mensajes con una sola escritura y un solo flush,
+    en vez de un flush por cada print (se nota en sesiones SSH lentas)
+    """
+    if not lines:
+        return
+    sys.stdout.write('\n'.join(lines) + '\n')
+    sys.stdout.flush()
+
+def _error(message):
+    """Los errores van directo a stderr para que se vean aunque el proceso falle"""
+    print(message, file=sys.stderr, flush=True)
+
 def setup_youtube_authentication():
     """
     Configura la autenticación de YouTube paso a paso
     """
-    print("=== CONFIGURACION DE AUTENTICACION YOUTUBE ===")
-    print()
+    out = ["=== CONFIGURACION DE AUTENTICACION YOUTUBE ===", ""]
     
     # Verificar archivo de credenciales
     if not os.path.exists('client_secret.json'):
-        print("ERROR: No se encontro client_secret.json")
-        print("Asegurate de que el archivo este en el directorio actual")
+        _emit(out)
+        _error("ERROR: No se encontro client_secret.json\n"
+               "Asegurate de que el archivo este en el directorio actual")
         return False
     
-    print("1. Archivo client_secret.json encontrado ✓")
+    out.append("1. Archivo client_secret.json encontrado ✓")
     
     # Verificar si ya existe token
     if os.path.exists('token.json'):
-        print("2. Token existente encontrado")
+        out.append("2. Token existente encontrado")
         try:
-            creds = Credentials.from_authorized_user_file('token.json', SCOPES)
+            creds = load_credentials('token.json')
             if creds and creds.valid:
-                print("   El token es valido ✓")
+                out.append("   El token es valido ✓")
+                _emit(out)
                 return True
             elif creds and creds.expired and creds.refresh_token:
-                print("   Token expirado, renovando...")
+                out.append("   Token expirado, renovando...")
+                _emit(out)
+                out = []
+                from google.auth.transport.requests import Request
                 creds.refresh(Request())
-                with open('token.json', 'w') as token_file:
-                    token_file.write(creds.to_json())
-                print("   Token renovado exitosamente ✓")
+                write_bytes('token.json', creds.to_json().encode('utf-8'))
+                _cached_creds.cache_clear()
+                _emit(["   Token renovado exitosamente ✓"])
                 return True
         except Exception as e:
-            print(f"   Error con token existente: {e}")
-            print("   Creando nuevo token...")
+            _emit(out)
+            out = []
+            _error(f"   Error con token existente: {e}")
+            out.append("   Creando nuevo token...")
     
     # Crear nuevo token
-    print("2. Iniciando proceso de autorizacion...")
-    print("   INSTRUCCIONES:")
-    print("   - Se abrira tu navegador")
-    print("   - Inicia sesion con tu cuenta de Google")
-    print("   - Autoriza el acceso a YouTube")
-    print("   - La pagina mostrara un codigo de confirmacion")
-    print()
+    out += [
+        "2. Iniciando proceso de autorizacion...",
+        "   INSTRUCCIONES:",
+        "   - Se abrira tu navegador",
+        "   - Inicia sesion con tu cuenta de Google",
+        "   - Autoriza el acceso a YouTube",
+        "   - La pagina mostrara un codigo de confirmacion",
+        ""
+    ]
+    _emit(out)
     
     try:
+        from google_auth_oauthlib.flow import InstalledAppFlow
         flow = InstalledAppFlow.from_client_secrets_file(
             'client_secret.json', SCOPES)
         
@@ -58,21 +104,23 @@ def setup_youtube_authentication():
         creds = flow.run_local_server(port=0, open_browser=True)
         
         # Guardar credenciales
-        with open('token.json', 'w') as token_file:
-            token_file.write(creds.to_json())
-            
-        print("3. Autenticacion completada exitosamente ✓")
-        print("4. Token guardado en token.json ✓")
+        write_bytes('token.json', creds.to_json().encode('utf-8'))
+        _cached_creds.cache_clear()
+        
+        _emit([
+            "3. Autenticacion completada exitosamente ✓",
+            "4. Token guardado en token.json ✓"
+        ])
         
         return True
         
     except Exception as e:
-        print(f"ERROR durante la autenticacion: {e}")
-        print()
-        print("SOLUCION DE PROBLEMAS:")
-        print("- Verifica tu conexion a internet")
-        print("- Asegurate de que ningun antivirus bloquee Python")
-        print("- Intenta cerrar otros programas que usen el puerto 8080")
+        _error(f"ERROR durante la autenticacion: {e}\n"
+               "\n"
+               "SOLUCION DE PROBLEMAS:\n"
+               "- Verifica tu conexion a internet\n"
+               "- Asegurate de que ningun antivirus bloquee Python\n"
+               "- Intenta cerrar otros programas que usen el puerto 8080")
         return False
 
 def test_authentication():
@@ -84,7 +132,7 @@ def test_authentication():
         return False
     
     try:
-        creds = Credentials.from_authorized_user_file('token.json', SCOPES)
+        creds = load_credentials('token.json')
         if creds and creds.valid:
             print("✓ Token valido - Listo para usar YouTube API")
             return True
@@ -96,30 +144,33 @@ def test_authentication():
         return False
 
 if __name__ == '__main__':
-    print("CONFIGURADOR DE AUTENTICACION YOUTUBE")
-    print("=====================================")
-    print()
+    _emit([
+        "CONFIGURADOR DE AUTENTICACION YOUTUBE",
+        "=====================================",
+        ""
+    ])
     
     success = setup_youtube_authentication()
     
     if success:
-        print()
-        print("=== RESUMEN ===")
-        print("✓ Autenticacion configurada correctamente")
-        print("✓ Archivo token.json creado")
-        print("✓ Listo para subir videos a YouTube")
-        print()
-        print("SIGUIENTE PASO:")
-        print("- Usa el token.json en tus scripts de subida")
-        print("- El token se renueva automaticamente cuando sea necesario")
-        
-        # Probar autenticación
-        print()
-        print("Probando autenticacion...")
+        _emit([
+            "",
+            "=== RESUMEN ===",
+            "✓ Autenticacion configurada correctamente",
+            "✓ Archivo token.json creado",
+            "✓ Listo para subir videos a YouTube",
+            "",
+            "SIGUIENTE PASO:",
+            "- Usa el token.json en tus scripts de subida",
+            "- El token se renueva automaticamente cuando sea necesario",
+            "",
+            # Probar autenticación
+            "Probando autenticacion..."
+        ])
         test_authentication()
         
     else:
-        print()
-        print("=== ERROR ===")
-        print("✗ No se pudo completar la autenticacion")
-        print("Revisa los mensajes de error arriba")
\ No newline at end of file
+        _error("\n"
+               "=== ERROR ===\n"
+               "✗ No se pudo completar la autenticacion\n"
+               "Revisa los mensajes de error arriba")
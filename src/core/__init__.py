@@ -1,5 +1,5 @@
 from .credentials_manager import CredentialsManager
-from .base_platform import BaseSocialPlatform
+from .base_platform import BaseSocialPlatform, UploadRequest
 from .platform_manager import PlatformManager
 
-__all__ = ['CredentialsManager', 'BaseSocialPlatform', 'PlatformManager']
\ No newline at end of file
+__all__ = ['CredentialsManager', 'BaseSocialPlatform', 'UploadRequest', 'PlatformManager']
\ No newline at end of file
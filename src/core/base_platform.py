@@ -1,13 +1,89 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+import asyncio
+from typing import Dict, Any, Optional, List, BinaryIO, Tuple
 from pathlib import Path
+from datetime import datetime, timezone
+from dataclasses import dataclass, field
 import logging
+import mmap
+import os
+import stat
+
+
+@dataclass(slots=True)
+class UploadRequest:
+    """
+    Upload data prepared by BaseSocialPlatform.prepare_upload_data
+    
+    Platform-specific parameters (tags, hashtags, privacy, ...) live in `extra`.
+    """
+    title: str
+    description: str
+    platform: str
+    timestamp: str
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+class ValidatedVideo:
+    """
+    Read-only memory map of a validated video file
+    
+    Used as a context manager so uploads can stream straight from the
+    mapped region and let the kernel page the file in on demand, instead
+    of every platform re-opening and buffering the video itself.
+    """
+    
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self._file = None
+        self._mm = None
+    
+    @property
+    def stream(self) -> Optional[mmap.mmap]:
+        """Seekable, file-like view of the video (only while the context is open)"""
+        return self._mm
+    
+    def __enter__(self):
+        self._file = open(self.path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            self._file = None
+            raise
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return False
+
 
 class BaseSocialPlatform(ABC):
     """
     Abstract base class for all social media platforms
     """
     
+    # Default formats - platforms can override
+    SUPPORTED_FORMATS = frozenset({'.mp4', '.mov', '.avi', '.mkv', '.webm'})
+    # Sorted copy returned by get_supported_formats(), built once per class
+    _SUPPORTED_FORMATS_SORTED = tuple(sorted(SUPPORTED_FORMATS))
+    
+    # HTTP connection pool: few hosts per platform, many keep-alive connections
+    # per host so concurrent uploads never wait on requests' default of 10
+    HTTP_POOL_CONNECTIONS = 4
+    HTTP_POOL_MAXSIZE = 32
+    
+    # Bytes read from a file/mmap body per socket send (http.client default: 8 KB).
+    # Each block is still copied into a bytes object; this only cuts the number
+    # of read/send calls. Applied on urllib3 2.x only
+    HTTP_BLOCKSIZE = 1024 * 1024
+    
     def __init__(self, credentials_manager):
         """
         Initialize platform with credentials manager
@@ -17,9 +93,66 @@ class BaseSocialPlatform(ABC):
         """
         self.credentials_manager = credentials_manager
         self.platform_name = self.get_platform_name()
+        self._creds_dir: Path = credentials_manager.get_platform_path(self.platform_name)
         self.logger = logging.getLogger(f"{__name__}.{self.platform_name}")
         self._authenticated = False
         self._credentials = None
+        self._session = None
+    
+    @property
+    def session(self):
+        """
+        Shared requests.Session for this platform's HTTP calls
+        
+        Created on first use so platforms that never call requests directly
+        don't import it. Connections are pooled between calls, and idempotent
+        requests (GET/PUT) are retried on 429 and 5xx responses.
+        """
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            # POST is not retried: it could publish the same video twice
+            retry = Retry(
+                total=5,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({'GET', 'PUT'}),
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=self.HTTP_POOL_CONNECTIONS,
+                                  pool_maxsize=self.HTTP_POOL_MAXSIZE,
+                                  max_retries=retry)
+            # Passed through to every connection the pool creates. urllib3 1.26
+            # has no 'blocksize' pool key and would reject every request with it
+            import urllib3
+            if int(urllib3.__version__.split('.')[0]) >= 2:
+                adapter.poolmanager.connection_pool_kw['blocksize'] = self.HTTP_BLOCKSIZE
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.hooks['response'].append(self._on_http_response)
+            self._session = session
+        return self._session
+    
+    def _on_http_response(self, response, *args, **kwargs):
+        """
+        Session response hook: a 401 means the token was rejected, so drop the
+        cached token and authenticate again (re-reading it from disk) next time
+        """
+        if response.status_code == 401:
+            if self._authenticated:
+                self.logger.warning("%s rejected the access token (HTTP 401)", self.platform_name)
+                self._authenticated = False
+            self.invalidate_token()
+    
+    def close(self):
+        """Close the HTTP session, if one was opened"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
     
     @abstractmethod
     def get_platform_name(self) -> str:
@@ -37,7 +170,8 @@ class BaseSocialPlatform(ABC):
         pass
     
     @abstractmethod
-    def upload_video(self, video_path: str, title: str, description: str, **kwargs) -> Dict[str, Any]:
+    def upload_video(self, video_path: str, title: str, description: str,
+                     stream: Optional[BinaryIO] = None, **kwargs) -> Dict[str, Any]:
         """
         Upload video to platform
         
@@ -45,6 +179,7 @@ class BaseSocialPlatform(ABC):
             video_path: Path to video file
             title: Video title
             description: Video description
+            stream: Pre-opened binary stream of the video (optional, see open_video)
             **kwargs: Platform-specific parameters
         
         Returns:
@@ -52,6 +187,15 @@ class BaseSocialPlatform(ABC):
         """
         pass
     
+    async def upload_video_async(self, video_path: str, title: str, description: str,
+                                 **kwargs) -> Dict[str, Any]:
+        """
+        Upload video to platform from asyncio code
+        
+        Runs upload_video in a worker thread; arguments and result are the same.
+        """
+        return await asyncio.to_thread(self.upload_video, video_path, title, description, **kwargs)
+    
     @abstractmethod
     def get_upload_status(self, upload_id: str) -> Dict[str, Any]:
         """
@@ -71,7 +215,7 @@ class BaseSocialPlatform(ABC):
     
     def get_credentials_path(self) -> Path:
         """Get the credentials directory for this platform"""
-        return self.credentials_manager.get_platform_path(self.platform_name)
+        return self._creds_dir
     
     def save_token(self, token_data: Dict[str, Any]) -> bool:
         """Save authentication token"""
@@ -81,6 +225,14 @@ class BaseSocialPlatform(ABC):
         """Load authentication token"""
         return self.credentials_manager.load_token(self.platform_name)
     
+    def invalidate_token(self):
+        """Drop the cached token, e.g. after the API rejected it with HTTP 401"""
+        self.credentials_manager.invalidate_token(self.platform_name)
+    
+    def token_needs_refresh(self) -> bool:
+        """Check whether the saved token is about to expire and should be refreshed first"""
+        return self.credentials_manager.token_needs_refresh(self.platform_name)
+    
     def validate_video_file(self, video_path: str) -> bool:
         """
         Validate video file exists and is accessible
@@ -91,86 +243,110 @@ class BaseSocialPlatform(ABC):
         Returns:
             bool: True if file is valid
         """
+        return self._stat_video_file(video_path) is not None
+    
+    def _stat_video_file(self, video_path: str) -> Optional[os.stat_result]:
+        """Validate a video file with a single stat() call and return its stat result"""
         try:
-            video_file = Path(video_path)
-            if not video_file.exists():
-                self.logger.error(f"Video file not found: {video_path}")
-                return False
-            
-            if not video_file.is_file():
-                self.logger.error(f"Path is not a file: {video_path}")
-                return False
-            
-            # Check file size (basic validation)
-            file_size = video_file.stat().st_size
-            if file_size == 0:
-                self.logger.error(f"Video file is empty: {video_path}")
-                return False
-            
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error validating video file {video_path}: {e}")
-            return False
+            st = os.stat(video_path)
+        except FileNotFoundError:
+            self.logger.error("Video file not found: %s", video_path)
+            return None
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.error("Error validating video file %s: %s", video_path, e)
+            return None
+        
+        if not stat.S_ISREG(st.st_mode):
+            self.logger.error("Path is not a file: %s", video_path)
+            return None
+        
+        if Path(video_path).suffix.lower() not in self.SUPPORTED_FORMATS:
+            self.logger.error("Unsupported video format for %s: %s", self.platform_name, video_path)
+            return None
+        
+        # Check file size (basic validation)
+        if st.st_size == 0:
+            self.logger.error("Video file is empty: %s", video_path)
+            return None
+        
+        return st
     
-    def get_supported_formats(self) -> List[str]:
+    def open_video(self, video_path: str) -> Optional[ValidatedVideo]:
         """
-        Get list of supported video formats for this platform
+        Validate a video file and prepare it for streaming
+        
+        Args:
+            video_path: Path to video file
         
         Returns:
-            List of supported file extensions
+            ValidatedVideo context manager, or None if the file is invalid
         """
-        # Default formats - platforms can override
-        return ['.mp4', '.mov', '.avi', '.mkv', '.webm']
+        st = self._stat_video_file(video_path)
+        if st is None:
+            return None
+        return ValidatedVideo(video_path, st.st_size)
     
-    def prepare_upload_data(self, title: str, description: str, **kwargs) -> Dict[str, Any]:
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._SUPPORTED_FORMATS_SORTED = tuple(sorted(cls.SUPPORTED_FORMATS))
+    
+    def get_supported_formats(self) -> Tuple[str, ...]:
+        """
+        Get the supported video formats for this platform
+        
+        Returns:
+            Sorted tuple of supported file extensions
+        """
+        return self._SUPPORTED_FORMATS_SORTED
+    
+    def prepare_upload_data(self, title: str, description: str, **kwargs) -> UploadRequest:
         """
         Prepare data for upload (validation, formatting)
         
         Args:
             title: Video title
             description: Video description
-            **kwargs: Additional parameters
+            **kwargs: Additional parameters (batch_timestamp: shared timestamp
+                      for an upload to several platforms)
         
         Returns:
-            Dict with prepared upload data
+            UploadRequest with prepared upload data; additional kwargs in `extra`
         """
-        # Basic validation and preparation
-        upload_data = {
-            'title': title.strip() if title else 'Untitled',
-            'description': description.strip() if description else '',
-            'timestamp': self._get_current_timestamp(),
-            'platform': self.platform_name
-        }
-        
-        # Add any additional kwargs
-        upload_data.update(kwargs)
+        timestamp = kwargs.pop('batch_timestamp', None) or self._get_current_timestamp()
         
-        return upload_data
+        # Basic validation and preparation
+        return UploadRequest(
+            title=title.strip() if title else 'Untitled',
+            description=description.strip() if description else '',
+            platform=self.platform_name,
+            timestamp=timestamp,
+            extra=kwargs
+        )
     
     def _get_current_timestamp(self) -> str:
-        """Get current timestamp in ISO format"""
-        from datetime import datetime
-        return datetime.now().isoformat()
+        """Get current UTC timestamp in ISO format"""
+        return datetime.now(timezone.utc).isoformat()
     
-    def log_upload_attempt(self, video_path: str, upload_data: Dict[str, Any]):
+    def log_upload_attempt(self, video_path: str, upload_data: UploadRequest):
         """Log upload attempt for debugging"""
-        self.logger.info(f"Attempting upload to {self.platform_name}")
-        self.logger.info(f"Video: {video_path}")
-        self.logger.info(f"Title: {upload_data.get('title', 'N/A')}")
-        self.logger.info(f"Description length: {len(upload_data.get('description', ''))}")
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        self.logger.info("Attempting upload to %s - video: %s, title: %s, description length: %d",
+                         self.platform_name, video_path,
+                         upload_data.title,
+                         len(upload_data.description))
     
     def log_upload_result(self, result: Dict[str, Any]):
         """Log upload result"""
         success = result.get('success', False)
         if success:
-            self.logger.info(f"Upload successful to {self.platform_name}")
-            if 'video_id' in result:
-                self.logger.info(f"Video ID: {result['video_id']}")
+            if not self.logger.isEnabledFor(logging.INFO):
+                return
+            self.logger.info("Upload successful to %s - video ID: %s",
+                             self.platform_name, result.get('video_id', 'N/A'))
         else:
-            self.logger.error(f"Upload failed to {self.platform_name}")
-            if 'error' in result:
-                self.logger.error(f"Error: {result['error']}")
+            self.logger.error("Upload failed to %s - error: %s",
+                              self.platform_name, result.get('error', 'Unknown error'))
     
     def __str__(self):
         """String representation"""
@@ -1,10 +1,14 @@
 import os
-import json
+import time
 import logging
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any, Set, Tuple
 from abc import ABC, abstractmethod
 
+from .json_io import read_json, write_json
+
 class CredentialsManager:
     """
     Centralized credentials manager for all social media platforms
@@ -27,12 +31,26 @@ class CredentialsManager:
         
         # Setup logging
         self.logger = logging.getLogger(__name__)
+        
+        # Parsed credential files keyed by (platform, filename):
+        # (data, file mtime in ns, expiry as epoch seconds or None)
+        self._token_cache: Dict[Tuple[str, str], Tuple[Dict[str, Any], int, Optional[float]]] = {}
+        self._cache_lock = threading.RLock()
+        
+        # Directories already created by this instance, so mkdir runs once per path
+        self._ensured_dirs: Set[Path] = {self.credentials_path}
+    
+    def _ensure_dir(self, path: Path) -> Path:
+        """Create a directory the first time it is requested"""
+        if path not in self._ensured_dirs:
+            with self._cache_lock:
+                path.mkdir(parents=True, exist_ok=True)
+                self._ensured_dirs.add(path)
+        return path
     
     def get_platform_path(self, platform: str) -> Path:
         """Get the credentials path for a specific platform"""
-        platform_path = self.credentials_path / platform.lower()
-        platform_path.mkdir(parents=True, exist_ok=True)
-        return platform_path
+        return self._ensure_dir(self.credentials_path / platform.lower())
     
     def save_credentials(self, platform: str, credentials: Dict[str, Any], filename: str = None) -> bool:
         """
@@ -54,20 +72,24 @@ class CredentialsManager:
             
             credentials_file = platform_path / filename
             
-            with open(credentials_file, 'w') as f:
-                json.dump(credentials, f, indent=4)
+            # Atomic write: a crash mid-save never leaves a truncated token file
+            write_json(credentials_file, credentials, fsync=True)
+            self.invalidate_token(platform, filename)
             
-            self.logger.info(f"Saved credentials for {platform} to {credentials_file}")
+            self.logger.info("Saved credentials for %s to %s", platform, credentials_file)
             return True
             
         except Exception as e:
-            self.logger.error(f"Error saving credentials for {platform}: {e}")
+            self.logger.error("Error saving credentials for %s: %s", platform, e)
             return False
     
     def load_credentials(self, platform: str, filename: str = None) -> Optional[Dict[str, Any]]:
         """
         Load credentials for a platform
         
+        Parsed files are cached in memory and only re-read when their
+        modification time changes.
+        
         Args:
             platform: Platform name
             filename: Optional custom filename
@@ -82,19 +104,29 @@ class CredentialsManager:
                 filename = f"{platform}_credentials.json"
             
             credentials_file = platform_path / filename
+            key = (platform, filename)
             
-            if not credentials_file.exists():
-                self.logger.warning(f"Credentials file not found: {credentials_file}")
+            try:
+                st = credentials_file.stat()
+            except FileNotFoundError:
+                self.logger.warning("Credentials file not found: %s", credentials_file)
+                self.invalidate_token(platform, filename)
                 return None
             
-            with open(credentials_file, 'r') as f:
-                credentials = json.load(f)
+            with self._cache_lock:
+                cached = self._token_cache.get(key)
+                if cached and cached[1] == st.st_mtime_ns:
+                    return dict(cached[0])
+                
+                credentials = read_json(credentials_file)
+                expiry = self._parse_expiry(credentials, st.st_mtime)
+                self._token_cache[key] = (credentials, st.st_mtime_ns, expiry)
             
-            self.logger.info(f"Loaded credentials for {platform}")
-            return credentials
+            self.logger.info("Loaded credentials for %s", platform)
+            return dict(credentials)
             
         except Exception as e:
-            self.logger.error(f"Error loading credentials for {platform}: {e}")
+            self.logger.error("Error loading credentials for %s: %s", platform, e)
             return None
     
     def save_token(self, platform: str, token_data: Dict[str, Any]) -> bool:
@@ -122,6 +154,67 @@ class CredentialsManager:
         """
         return self.load_credentials(platform, f"{platform}_token.json")
     
+    def invalidate_token(self, platform: str, filename: str = None):
+        """
+        Drop a cached token so the next load re-reads it from disk
+        
+        Args:
+            platform: Platform name
+            filename: Optional custom filename (defaults to the token file)
+        """
+        if filename is None:
+            filename = f"{platform}_token.json"
+        
+        with self._cache_lock:
+            self._token_cache.pop((platform, filename), None)
+    
+    def token_needs_refresh(self, platform: str, skew: float = 5.0) -> bool:
+        """
+        Check whether a platform token expires within `skew` seconds
+        
+        Args:
+            platform: Platform name
+            skew: Seconds before expiry at which the token counts as expired
+        
+        Returns:
+            bool: True if the token is known to be (nearly) expired
+        """
+        if self.load_token(platform) is None:
+            return False
+        
+        with self._cache_lock:
+            cached = self._token_cache.get((platform, f"{platform}_token.json"))
+        
+        if not cached or cached[2] is None:
+            return False
+        
+        return time.time() >= cached[2] - skew
+    
+    @staticmethod
+    def _parse_expiry(credentials: Dict[str, Any], saved_at: float) -> Optional[float]:
+        """
+        Get a token's expiry as epoch seconds
+        
+        Understands 'expires_at' (epoch seconds), 'expiry' (ISO 8601, as written
+        by google-auth) and 'expires_in' (seconds, counted from when the file was saved).
+        """
+        try:
+            if credentials.get('expires_at'):
+                return float(credentials['expires_at'])
+            
+            if credentials.get('expiry'):
+                expiry = datetime.fromisoformat(str(credentials['expiry']).rstrip('Z'))
+                if expiry.tzinfo is None:
+                    expiry = expiry.replace(tzinfo=timezone.utc)
+                return expiry.timestamp()
+            
+            if credentials.get('expires_in'):
+                return saved_at + float(credentials['expires_in'])
+        except (TypeError, ValueError):
+            pass
+        
+        return None
+    
     def get_client_secrets_path(self, platform: str) -> Path:
         """Get the path for client secrets file"""
         platform_path = self.get_platform_path(platform)
@@ -134,45 +227,60 @@ class CredentialsManager:
     
     def list_platform_files(self, platform: str) -> list:
         """List all files for a specific platform"""
+        platform_path = self.get_platform_path(platform)
         try:
-            platform_path = self.get_platform_path(platform)
-            return [f.name for f in platform_path.iterdir() if f.is_file()]
-        except Exception as e:
-            self.logger.error(f"Error listing files for {platform}: {e}")
+            # scandir entries carry the file type, so no extra stat per file
+            with os.scandir(platform_path) as entries:
+                return [entry.name for entry in entries if entry.is_file()]
+        except OSError as e:
+            self.logger.error("Error listing files for %s: %s", platform, e)
             return []
     
-    def backup_credentials(self, platform: str = None) -> bool:
+    def backup_credentials(self, platform: str = None, *, platforms: List[str] = None) -> bool:
         """
         Create backup of credentials
         
         Args:
             platform: Specific platform to backup, or None for all
+            platforms: Several platforms to backup into a single archive
         
         Returns:
             bool: Success status
         """
         try:
-            backup_path = self.credentials_path / "backups"
-            backup_path.mkdir(exist_ok=True)
+            backup_path = self._ensure_dir(self.credentials_path / "backups")
             
-            import shutil
-            from datetime import datetime
+            import zipfile
             
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
-            if platform:
+            if platforms:
+                # Backup several platforms in one pass, keeping their directories
+                roots = [self.get_platform_path(name) for name in platforms]
+                base = self.credentials_path
+                backup_file = backup_path / f"platforms_backup_{timestamp}.zip"
+            elif platform:
                 # Backup specific platform
-                platform_path = self.get_platform_path(platform)
+                roots = [self.get_platform_path(platform)]
+                base = roots[0]
                 backup_file = backup_path / f"{platform}_backup_{timestamp}.zip"
-                shutil.make_archive(backup_file.with_suffix(''), 'zip', platform_path)
             else:
                 # Backup all platforms
+                roots = [self.credentials_path]
+                base = self.credentials_path
                 backup_file = backup_path / f"all_credentials_backup_{timestamp}.zip"
-                shutil.make_archive(backup_file.with_suffix(''), 'zip', self.credentials_path)
             
-            self.logger.info(f"Created backup: {backup_file}")
+            # Token files are small, high-entropy JSON: store them without
+            # compression, and never include earlier backups
+            with zipfile.ZipFile(backup_file, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+                for root in roots:
+                    for path in root.rglob('*'):
+                        if path.is_file() and backup_path not in path.parents:
+                            zf.write(path, path.relative_to(base))
+            
+            self.logger.info("Created backup: %s", backup_file)
             return True
             
         except Exception as e:
-            self.logger.error(f"Error creating backup: {e}")
+            self.logger.error("Error creating backup: %s", e)
             return False
\ No newline at end of file
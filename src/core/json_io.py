@@ -0,0 +1,106 @@
+"""
+JSON helpers shared by the credential/token readers and writers.
+
+Uses orjson when it is installed and falls back to the stdlib json module.
+"""
+
+import json
+import os
+import tempfile
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional accelerator
+    orjson = None
+
+
+def loads(data):
+    """
+    Parse JSON from str or bytes
+
+    Args:
+        data: JSON document as str or bytes
+
+    Returns:
+        Parsed Python object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded, 2-space indented JSON
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        bytes: Encoded JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+
+def read_json(path):
+    """
+    Read and parse a JSON file with a single read
+
+    The file is opened unbuffered: read() sizes its buffer from fstat and
+    fills it straight from the file, with no BufferedReader in between.
+
+    Args:
+        path: File path
+
+    Returns:
+        Parsed Python object
+    """
+    with open(path, 'rb', buffering=0) as f:
+        return loads(f.read())
+
+
+def write_bytes(path, data: bytes, fsync: bool = False):
+    """
+    Atomically replace a file with the given bytes
+
+    The data is written with os.write() straight to a temporary file in the
+    same directory, which is then moved over the target with os.replace(),
+    so a crash mid-write never leaves a truncated token file behind.
+
+    Args:
+        path: File path
+        data: Encoded file contents
+        fsync: Flush the data to disk before the rename
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            if fsync:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json(path, obj, fsync: bool = False):
+    """
+    Serialize an object and write it to a JSON file
+
+    Args:
+        path: File path
+        obj: JSON-serializable object
+        fsync: Flush the data to disk before the rename
+    """
+    write_bytes(path, dumps(obj), fsync=fsync)
@@ -2,8 +2,14 @@
 Platform Manager - Central hub for managing all social media platforms
 """
 
+import asyncio
+import importlib
 import logging
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Any, Optional, Tuple, Type, Union
 from pathlib import Path
 
 from .credentials_manager import CredentialsManager
@@ -14,52 +20,100 @@ class PlatformManager:
     Manages multiple social media platforms
     """
     
-    def __init__(self, credentials_path: str = None):
+    def __init__(self, credentials_path: str = None, max_concurrent_uploads: int = None):
         """
         Initialize platform manager
         
         Args:
             credentials_path: Path to credentials directory
+            max_concurrent_uploads: Maximum uploads running at once in
+                                    upload_video_to_multiple_platforms (default: one per platform)
         """
         self.credentials_manager = CredentialsManager(credentials_path)
+        self.max_concurrent_uploads = max_concurrent_uploads
         self.platforms: Dict[str, BaseSocialPlatform] = {}
         self.logger = logging.getLogger(__name__)
         
+        # Registered platforms not instantiated yet: name -> class or 'module:ClassName'
+        self._lazy_platforms: Dict[str, Union[Type[BaseSocialPlatform], str]] = {}
+        self._platforms_lock = threading.Lock()
+        
+        # Per-platform status: name -> (time.monotonic() when built, status).
+        # Entries expire after _status_ttl seconds and are dropped after
+        # anything that can change them (register, authenticate, upload).
+        self._status_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._status_ttl = 2.0
+        
         # Initialize available platforms
         self._initialize_platforms()
     
     def _initialize_platforms(self):
-        """Initialize all available platform implementations"""
-        try:
-            # Import and register YouTube platform - TEMPORARILY DISABLED
-            # from platforms.youtube.youtube_platform import YouTubePlatform
-            # self.register_platform('youtube', YouTubePlatform)
+        """
+        Declare all available platform implementations
+        
+        Platform modules (and the SDKs they pull in) are only imported the
+        first time the platform is requested through get_platform().
+        """
+        # YouTube platform - TEMPORARILY DISABLED
+        # self.register_platform('youtube', 'platforms.youtube.youtube_platform:YouTubePlatform')
+        
+        self.register_platform('tiktok', 'platforms.tiktok.tiktok_platform:TikTokPlatform')
+        self.register_platform('facebook', 'platforms.facebook.facebook_platform:FacebookPlatform')
+    
+    def _load_platform(self, name: str) -> Optional[BaseSocialPlatform]:
+        """Import (if needed) and instantiate a registered platform"""
+        with self._platforms_lock:
+            if name in self.platforms:
+                return self.platforms[name]
             
-            # Import and register TikTok platform
-            from platforms.tiktok.tiktok_platform import TikTokPlatform
-            self.register_platform('tiktok', TikTokPlatform)
+            platform_class = self._lazy_platforms.get(name)
+            if platform_class is None:
+                return None
             
-            # Import and register Facebook platform
-            from platforms.facebook.facebook_platform import FacebookPlatform
-            self.register_platform('facebook', FacebookPlatform)
+            if isinstance(platform_class, str):
+                module_name, class_name = platform_class.split(':')
+                try:
+                    platform_class = getattr(importlib.import_module(module_name), class_name)
+                except ImportError as e:
+                    self.logger.warning("Platform %s could not be imported: %s", name, e)
+                    del self._lazy_platforms[name]
+                    return None
             
-        except ImportError as e:
-            self.logger.warning(f"Some platforms could not be imported: {e}")
+            # Platforms that keep one instance per credentials directory
+            # (FacebookPlatform.shared) hand out that instance instead
+            factory = getattr(platform_class, 'shared', platform_class)
+            try:
+                platform_instance = factory(self.credentials_manager)
+            except Exception as e:
+                self.logger.error("Failed to initialize platform %s: %s", name, e)
+                # Drop the entry like a failed import, so it is not retried
+                # (and listed as available) on every lookup
+                del self._lazy_platforms[name]
+                self._invalidate_status_cache(name)
+                return None
+            
+            self.platforms[name] = platform_instance
+            del self._lazy_platforms[name]
+            self._invalidate_status_cache(name)
+            return platform_instance
     
-    def register_platform(self, name: str, platform_class):
+    def register_platform(self, name: str, platform_class: Union[Type[BaseSocialPlatform], str]):
         """
         Register a platform class
         
+        The platform is instantiated on first use through get_platform().
+        
         Args:
             name: Platform name
-            platform_class: Platform class (subclass of BaseSocialPlatform)
+            platform_class: Platform class (subclass of BaseSocialPlatform), or
+                            its 'module:ClassName' import path
         """
-        try:
-            platform_instance = platform_class(self.credentials_manager)
-            self.platforms[name] = platform_instance
-            self.logger.info(f"Registered platform: {name}")
-        except Exception as e:
-            self.logger.error(f"Failed to register platform {name}: {e}")
+        name = name.lower()
+        with self._platforms_lock:
+            self.platforms.pop(name, None)
+            self._lazy_platforms[name] = platform_class
+            self._invalidate_status_cache(name)
+        self.logger.info("Registered platform: %s", name)
     
     def get_platform(self, name: str) -> Optional[BaseSocialPlatform]:
         """
@@ -71,11 +125,15 @@ class PlatformManager:
         Returns:
             Platform instance or None if not found
         """
-        return self.platforms.get(name.lower())
+        name = name.lower()
+        platform = self.platforms.get(name)
+        if platform is None and name in self._lazy_platforms:
+            platform = self._load_platform(name)
+        return platform
     
     def get_available_platforms(self) -> List[str]:
-        """Get list of available platform names"""
-        return list(self.platforms.keys())
+        """Get list of available platform names (without importing them)"""
+        return list(dict.fromkeys([*self.platforms, *self._lazy_platforms]))
     
     def authenticate_platform(self, platform_name: str) -> bool:
         """
@@ -89,27 +147,48 @@ class PlatformManager:
         """
         platform = self.get_platform(platform_name)
         if not platform:
-            self.logger.error(f"Platform not found: {platform_name}")
+            self.logger.error("Platform not found: %s", platform_name)
             return False
         
-        return platform.authenticate()
+        try:
+            return platform.authenticate()
+        finally:
+            self._invalidate_status_cache(platform_name)
     
     def authenticate_all_platforms(self) -> Dict[str, bool]:
         """
         Authenticate with all registered platforms
         
+        Platforms are authenticated concurrently since each one talks to
+        an independent API.
+        
         Returns:
             Dict mapping platform names to authentication success status
         """
         results = {}
-        for name, platform in self.platforms.items():
-            try:
-                results[name] = platform.authenticate()
-            except Exception as e:
-                self.logger.error(f"Authentication failed for {name}: {e}")
-                results[name] = False
+        platforms = {}
+        for name in self.get_available_platforms():
+            platform = self.get_platform(name)
+            if platform:
+                platforms[name] = platform
+        if not platforms:
+            return results
         
-        return results
+        with ThreadPoolExecutor(max_workers=len(platforms)) as executor:
+            futures = {
+                executor.submit(platform.authenticate): name
+                for name, platform in platforms.items()
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    self.logger.error("Authentication failed for %s: %s", name, e)
+                    results[name] = False
+        
+        self._invalidate_status_cache()
+        return {name: results[name] for name in platforms}
     
     def upload_video_to_platform(self, platform_name: str, video_path: str, 
                                 title: str, description: str, **kwargs) -> Dict[str, Any]:
@@ -130,18 +209,85 @@ class PlatformManager:
         if not platform:
             return {'success': False, 'error': f'Platform not found: {platform_name}'}
         
-        if not platform.is_authenticated():
-            self.logger.warning(f"Platform {platform_name} not authenticated, attempting authentication...")
-            if not platform.authenticate():
-                return {'success': False, 'error': f'Authentication failed for {platform_name}'}
+        try:
+            if not platform.is_authenticated():
+                self.logger.warning("Platform %s not authenticated, attempting authentication...", platform_name)
+                if not platform.authenticate():
+                    return {'success': False, 'error': f'Authentication failed for {platform_name}'}
+            elif platform.token_needs_refresh():
+                # Renew a token that is about to expire before the upload, not after a 401
+                self.logger.info("Token for %s is about to expire, re-authenticating...", platform_name)
+                if not platform.authenticate():
+                    return {'success': False, 'error': f'Authentication failed for {platform_name}'}
+            
+            video = platform.open_video(video_path)
+            if video is None:
+                return {'success': False, 'error': f'Invalid video file: {video_path}'}
+            
+            with video:
+                return platform.upload_video(video_path, title, description,
+                                             stream=video.stream, **kwargs)
+        finally:
+            # Uploads can (re)authenticate the platform
+            self._invalidate_status_cache(platform_name)
+    
+    async def upload_video_to_platform_async(self, platform_name: str, video_path: str,
+                                             title: str, description: str, **kwargs) -> Dict[str, Any]:
+        """
+        Upload video to specific platform from asyncio code
         
-        return platform.upload_video(video_path, title, description, **kwargs)
+        The blocking upload runs in a worker thread so the event loop stays
+        responsive. Arguments and result are the same as upload_video_to_platform.
+        """
+        return await asyncio.to_thread(
+            self.upload_video_to_platform,
+            platform_name, video_path, title, description, **kwargs
+        )
+    
+    async def upload_video_to_multiple_platforms_async(self, platforms: List[str], video_path: str,
+                                                       title: str, description: str, **kwargs) -> Dict[str, Any]:
+        """
+        Upload video to multiple platforms from asyncio code
+        
+        Same as upload_video_to_multiple_platforms, but the per-platform
+        uploads are awaited together with asyncio.gather (at most
+        max_concurrent_uploads at a time).
+        """
+        results = {}
+        platforms = list(dict.fromkeys(platforms))
+        if not platforms:
+            return results
+        
+        # Same timestamp on every platform's record of this upload
+        kwargs.setdefault('batch_timestamp', datetime.now(timezone.utc).isoformat())
+        
+        semaphore = asyncio.Semaphore(self.max_concurrent_uploads or len(platforms))
+        
+        async def upload(platform_name: str) -> Dict[str, Any]:
+            async with semaphore:
+                self.logger.info("Uploading to %s...", platform_name)
+                return await self.upload_video_to_platform_async(
+                    platform_name, video_path, title, description, **kwargs
+                )
+        
+        outcomes = await asyncio.gather(*(upload(name) for name in platforms), return_exceptions=True)
+        for platform_name, outcome in zip(platforms, outcomes):
+            if isinstance(outcome, Exception):
+                outcome = {'success': False, 'error': str(outcome)}
+            results[platform_name] = outcome
+        
+        self._log_upload_results(results)
+        return results
     
     def upload_video_to_multiple_platforms(self, platforms: List[str], video_path: str,
                                          title: str, description: str, **kwargs) -> Dict[str, Any]:
         """
         Upload video to multiple platforms
         
+        Uploads run concurrently, one worker per platform (capped by
+        max_concurrent_uploads); results are logged in the order the
+        platforms were given.
+        
         Args:
             platforms: List of platform names
             video_path: Path to video file  
@@ -153,21 +299,46 @@ class PlatformManager:
             Dict mapping platform names to upload results
         """
         results = {}
+        platforms = list(dict.fromkeys(platforms))
+        if not platforms:
+            return results
         
-        for platform_name in platforms:
-            self.logger.info(f"Uploading to {platform_name}...")
-            result = self.upload_video_to_platform(
-                platform_name, video_path, title, description, **kwargs
-            )
-            results[platform_name] = result
+        # Same timestamp on every platform's record of this upload
+        kwargs.setdefault('batch_timestamp', datetime.now(timezone.utc).isoformat())
+        
+        max_workers = len(platforms)
+        if self.max_concurrent_uploads:
+            max_workers = min(max_workers, self.max_concurrent_uploads)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for platform_name in platforms:
+                self.logger.info("Uploading to %s...", platform_name)
+                future = executor.submit(
+                    self.upload_video_to_platform,
+                    platform_name, video_path, title, description, **kwargs
+                )
+                futures[future] = platform_name
             
-            if result['success']:
-                self.logger.info(f"Upload to {platform_name} successful")
-            else:
-                self.logger.error(f"Upload to {platform_name} failed: {result.get('error', 'Unknown error')}")
+            for future in as_completed(futures):
+                platform_name = futures[future]
+                try:
+                    results[platform_name] = future.result()
+                except Exception as e:
+                    results[platform_name] = {'success': False, 'error': str(e)}
         
+        results = {name: results[name] for name in platforms}
+        self._log_upload_results(results)
         return results
     
+    def _log_upload_results(self, results: Dict[str, Dict[str, Any]]):
+        """Log the outcome of a multi-platform upload"""
+        for platform_name, result in results.items():
+            if result['success']:
+                self.logger.info("Upload to %s successful", platform_name)
+            else:
+                self.logger.error("Upload to %s failed: %s", platform_name, result.get('error', 'Unknown error'))
+    
     def get_platform_status(self, platform_name: str) -> Dict[str, Any]:
         """
         Get status information for a platform
@@ -176,27 +347,55 @@ class PlatformManager:
             platform_name: Platform name
         
         Returns:
-            Dict containing platform status
+            Dict containing platform status (cached for _status_ttl seconds)
         """
-        platform = self.get_platform(platform_name)
+        name = platform_name.lower()
+        now = time.monotonic()
+        hit = self._status_cache.get(name)
+        if hit and now - hit[0] < self._status_ttl:
+            return hit[1]
+        
+        platform = self.get_platform(name)
         if not platform:
             return {'exists': False, 'error': 'Platform not found'}
         
-        return {
+        status = {
             'exists': True,
             'authenticated': platform.is_authenticated(),
             'platform_name': platform.platform_name,
             'credentials_path': str(platform.get_credentials_path()),
             'supported_formats': platform.get_supported_formats()
         }
+        self._status_cache[name] = (now, status)
+        return status
     
     def get_all_platform_status(self) -> Dict[str, Dict[str, Any]]:
         """Get status for all registered platforms"""
         status = {}
-        for name in self.platforms.keys():
-            status[name] = self.get_platform_status(name)
+        for name in self.get_available_platforms():
+            platform_status = self.get_platform_status(name)
+            # Skip platforms whose module failed to import on first use
+            if platform_status['exists']:
+                status[name] = platform_status
         return status
     
+    def _invalidate_status_cache(self, platform_name: str = None):
+        """
+        Drop cached platform status
+        
+        Args:
+            platform_name: Platform to drop, or None for all
+        """
+        if platform_name is None:
+            self._status_cache.clear()
+        else:
+            self._status_cache.pop(platform_name.lower(), None)
+    
+    def close(self):
+        """Close the HTTP sessions of all instantiated platforms"""
+        for platform in list(self.platforms.values()):
+            platform.close()
+    
     def backup_all_credentials(self) -> bool:
         """Create backup of all platform credentials"""
         return self.credentials_manager.backup_credentials()
@@ -230,5 +429,5 @@ class PlatformManager:
     
     def __str__(self):
         """String representation"""
-        platform_list = ', '.join(self.platforms.keys())
+        platform_list = ', '.join(self.get_available_platforms())
         return f"PlatformManager with platforms: {platform_list}"
\ No newline at end of file
@@ -1,25 +1,102 @@
-import json
-import requests
+import hashlib
+import mmap
 import os
-from pathlib import Path
-from typing import Dict, Any, Optional, List
-from core.base_platform import BaseSocialPlatform
+import random
+import threading
+from typing import Dict, Any, Optional, List, BinaryIO
+from core.base_platform import BaseSocialPlatform, UploadRequest
+from core.json_io import loads
 import time
 
 
+def _truncate(text: str, limit: int) -> str:
+    """Cut text to at most `limit` characters, without copying if it already fits"""
+    return text if len(text) <= limit else text[:limit]
+
+
 class FacebookPlatform(BaseSocialPlatform):
     """
     Facebook platform implementation using Graph API
     """
     
+    base_url = "https://graph.facebook.com/v23.0"
+    video_base_url = "https://graph-video.facebook.com/v23.0"
+    
+    # Facebook field limits, in characters
+    TITLE_MAX_CHARS = 100
+    DESCRIPTION_MAX_CHARS = 60000
+    
+    # Facebook supports most common video formats
+    SUPPORTED_FORMATS = frozenset({'.mp4', '.mov', '.avi', '.wmv', '.flv', '.webm', '.mkv', '.3gp'})
+    
+    # Times an interrupted upload is resumed from the offset Facebook reports
+    MAX_RESUME_ATTEMPTS = 3
+    # (connect, read) timeout for the file body: a stalled connection fails
+    # after the read timeout and is resumed instead of blocking for 10 minutes
+    UPLOAD_TIMEOUT = (10, 120)
+    
+    # Transient Graph API errors: POSTs are retried with exponential backoff
+    # (honouring Retry-After); GETs are already retried by the session adapter
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    MAX_RETRIES = 5
+    RETRY_BACKOFF = 0.5
+    MAX_RETRY_DELAY = 60.0
+    
+    # Usage headers (X-App-Usage / X-Page-Usage) report % of quota used; above
+    # USAGE_THRESHOLD calls are spaced out, up to USAGE_MAX_PAUSE seconds at 100%.
+    # Pauses are shared by all instances using the same app.
+    USAGE_THRESHOLD = 80
+    USAGE_MAX_PAUSE = 30.0
+    _usage_pause_until: Dict[str, float] = {}
+    _usage_lock = threading.Lock()
+    
+    # Video bodies uploaded at once by this process (env: FB_UPLOAD_CONCURRENCY);
+    # an upload waiting longer than UPLOAD_QUEUE_TIMEOUT for a slot fails fast
+    _upload_slots = threading.BoundedSemaphore(int(os.getenv('FB_UPLOAD_CONCURRENCY', '3')))
+    UPLOAD_QUEUE_TIMEOUT = 30.0
+    
+    # Seconds a successful token check is trusted before authenticate() calls the API again
+    AUTH_TTL = 300.0
+    
+    # Tokens verified by any instance in this process: blake2b(page_id, token) -> monotonic deadline.
+    # Lets new instances (e.g. one per batch run) skip the test call for AUTH_TTL seconds
+    _verified_tokens: Dict[str, float] = {}
+    _verified_tokens_lock = threading.Lock()
+    
+    # Shared instances keyed by credentials directory, see shared()
+    _instances: Dict[str, 'FacebookPlatform'] = {}
+    _instances_lock = threading.Lock()
+    
     def __init__(self, credentials_manager):
         super().__init__(credentials_manager)
-        self.base_url = "https://graph.facebook.com/v23.0"
-        self.video_base_url = "https://graph-video.facebook.com/v23.0"
+        self._auth_lock = threading.Lock()
         self.access_token = None
         self.page_id = None
         self.app_id = None
+        self._auth_validated_at = 0.0
+        
+        # Built once per token in authenticate()
+        self._url_page = None
+        self._url_uploads = None
+        self._url_videos = None
+        self._auth_params = {}
+        
+    @classmethod
+    def shared(cls, credentials_manager) -> 'FacebookPlatform':
+        """
+        Get the process-wide instance for a credentials directory
         
+        Reusing it keeps one HTTP session and one validated token for every
+        video uploaded with the same credentials, instead of a new TLS
+        handshake and token check per instance.
+        """
+        key = str(credentials_manager.get_platform_path('facebook'))
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = cls._instances[key] = cls(credentials_manager)
+            return instance
+    
     def get_platform_name(self) -> str:
         """Return platform name"""
         return "facebook"
@@ -29,9 +106,17 @@ class FacebookPlatform(BaseSocialPlatform):
         Verifica si el token existe y no ha expirado.
         Carga access_token, page_id, ig_user_id
         
+        Serializado con un lock para que hilos concurrentes no repitan la
+        prueba del token a la vez.
+        
         Returns:
             bool: True si está todo listo, False si falta algo
         """
+        with self._auth_lock:
+            return self._authenticate()
+    
+    def _authenticate(self) -> bool:
+        """Cuerpo de authenticate(), llamado con _auth_lock tomado"""
         try:
             token_data = self.load_token()
             if not token_data:
@@ -50,16 +135,39 @@ class FacebookPlatform(BaseSocialPlatform):
                 self.logger.error(f"Faltan campos requeridos en el token: {', '.join(missing_fields)}")
                 return False
             
+            # Same token validated recently (and no 401 since): skip the test call
+            if (self._authenticated
+                    and token_data['access_token'] == self.access_token
+                    and time.monotonic() - self._auth_validated_at < self.AUTH_TTL):
+                return True
+            
             self.access_token = token_data['access_token']
             self.page_id = token_data['page_id']
             self.app_id = token_data['app_id']
             
-            # Test authentication by making a simple API call
-            if self._test_authentication():
+            self._url_page = f"{self.base_url}/{self.page_id}"
+            self._url_uploads = f"{self.base_url}/{self.app_id}/uploads"
+            self._url_videos = f"{self.video_base_url}/{self.page_id}/videos"
+            self._auth_params = {'access_token': self.access_token}
+            
+            # Test authentication by making a simple API call, unless another
+            # instance verified the same token recently
+            token_key = self._token_key()
+            with self._verified_tokens_lock:
+                verified = self._verified_tokens.get(token_key, 0.0) > time.monotonic()
+            
+            if verified or self._test_authentication():
+                # Upload-session endpoints authenticate with this header; set it once
+                self.session.headers['Authorization'] = f'OAuth {self.access_token}'
                 self._authenticated = True
+                self._auth_validated_at = time.monotonic()
+                if not verified:
+                    with self._verified_tokens_lock:
+                        self._verified_tokens[token_key] = self._auth_validated_at + self.AUTH_TTL
                 self.logger.info("Autenticación de Facebook exitosa")
                 return True
             else:
+                self._authenticated = False
                 self.logger.error("Falló la prueba de autenticación de Facebook")
                 return False
                 
@@ -67,19 +175,21 @@ class FacebookPlatform(BaseSocialPlatform):
             self.logger.error(f"Error durante la autenticación de Facebook: {e}")
             return False
     
+    def _token_key(self) -> str:
+        """Key of the current page/token pair in _verified_tokens (the token itself is not stored)"""
+        raw = f"{self.page_id}:{self.access_token}".encode('utf-8')
+        return hashlib.blake2b(raw, digest_size=8).hexdigest()
+    
     def _test_authentication(self) -> bool:
         """
         Test if current access token is valid
         """
         try:
-            params = {
-                'access_token': self.access_token,
-                'fields': 'id,name'
-            }
+            params = {**self._auth_params, 'fields': 'id,name'}
             
             # Test with page info endpoint
-            response = requests.get(
-                f"{self.base_url}/{self.page_id}",
+            response = self.session.get(
+                self._url_page,
                 params=params,
                 timeout=10
             )
@@ -90,7 +200,8 @@ class FacebookPlatform(BaseSocialPlatform):
             self.logger.error(f"Authentication test failed: {e}")
             return False
     
-    def upload_video(self, video_path: str, title: str, description: str, hashtags: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
+    def upload_video(self, video_path: str, title: str, description: str, hashtags: Optional[List[str]] = None,
+                     stream: Optional[BinaryIO] = None, **kwargs) -> Dict[str, Any]:
         """
         Upload video to Facebook page.
         
@@ -99,6 +210,7 @@ class FacebookPlatform(BaseSocialPlatform):
             title: Video title
             description: Video description
             hashtags: List of hashtags (optional)
+            stream: Pre-opened binary stream of the video (optional)
         
         Returns:
             Dict containing upload result
@@ -109,19 +221,30 @@ class FacebookPlatform(BaseSocialPlatform):
                 if not self.authenticate():
                     return {"success": False, "error": "Falló la autenticación"}
             
-            if not self.validate_video_file(video_path):
-                return {"success": False, "error": "Archivo de video inválido"}
+            # A memory-mapped stream comes from open_video(), which already
+            # validated the file: its length is the file size, no stat needed
+            if isinstance(stream, mmap.mmap):
+                file_size = len(stream)
+            else:
+                video_stat = self._stat_video_file(video_path)
+                if video_stat is None:
+                    return {"success": False, "error": "Archivo de video inválido"}
+                file_size = video_stat.st_size
             
             # Prepare upload data
-            upload_data = self.prepare_upload_data(title, description, hashtags=hashtags)
+            upload_data = self.prepare_upload_data(title, description, hashtags=hashtags,
+                                                   batch_timestamp=kwargs.get('batch_timestamp'))
             self.log_upload_attempt(video_path, upload_data)
             
-            # Construir texto combinado
-            combined_text = self._format_combined_text(title, description, hashtags)
+            # Texto combinado (ya construido por prepare_upload_data)
+            combined_text = upload_data.extra['combined_text']
             
             # Upload video using resumable upload API and then publish
             print("[UPLOAD] Subiendo video a Facebook usando API de subida reanudable...")
-            result = self._upload_video_resumable(video_path, title, combined_text)
+            # Truncate once here, so resumed/retried steps reuse the same text
+            title = _truncate(title or '', self.TITLE_MAX_CHARS)
+            combined_text = _truncate(combined_text, self.DESCRIPTION_MAX_CHARS)
+            result = self._upload_video_resumable(video_path, title, combined_text, file_size, stream)
             
             if result.get("success"):
                 print("[SUCCESS] Video publicado en Facebook")
@@ -137,25 +260,43 @@ class FacebookPlatform(BaseSocialPlatform):
             self.logger.error(error_msg)
             return {"success": False, "error": error_msg}
     
-    def _upload_video_resumable(self, video_path: str, title: str, description: str) -> Dict[str, Any]:
+    def _upload_video_resumable(self, video_path: str, title: str, description: str, file_size: int,
+                                stream: Optional[BinaryIO] = None) -> Dict[str, Any]:
         """
         Upload video using Facebook's resumable upload API and then publish it.
         
         Process:
         1. Start upload session
-        2. Upload video file
+        2. Upload video file (resuming from the last received byte if interrupted)
         3. Publish video with the file handle
         """
         try:
             # Step 1: Start upload session
-            upload_session = self._start_upload_session(video_path)
+            upload_session = self._start_upload_session(video_path, file_size)
             if not upload_session.get("success"):
                 return upload_session
             
             upload_session_id = upload_session["session_id"]
             
             # Step 2: Upload the file
-            file_handle_result = self._upload_file(upload_session_id, video_path)
+            file_handle_result = self._upload_file(upload_session_id, video_path, stream)
+            
+            attempts = 0
+            while (not file_handle_result.get("success")
+                   and not file_handle_result.get("queue_full")
+                   and self._is_resumable(file_handle_result)
+                   and attempts < self.MAX_RESUME_ATTEMPTS):
+                attempts += 1
+                session_state = self._resume_upload_session(upload_session_id)
+                if not session_state.get("success"):
+                    break
+                
+                file_offset = int(session_state.get("file_offset") or 0)
+                self.logger.warning("Reanudando subida desde el byte %s (intento %s)", file_offset, attempts)
+                time.sleep(self._retry_delay(None, attempts - 1))
+                file_handle_result = self._upload_file_with_offset(upload_session_id, video_path,
+                                                                   file_offset, stream)
+            
             if not file_handle_result.get("success"):
                 return file_handle_result
             
@@ -170,27 +311,38 @@ class FacebookPlatform(BaseSocialPlatform):
             self.logger.error(error_msg)
             return {"success": False, "error": error_msg}
     
-    def _start_upload_session(self, video_path: str) -> Dict[str, Any]:
+    def _is_resumable(self, result: Dict[str, Any]) -> bool:
+        """
+        Network errors and timeouts (marked "resumable"), 5xx and RETRY_STATUSES
+        are resumed; other 4xx, a missing file handle and other errors are final
+        """
+        status_code = result.get("status_code")
+        if status_code is None:
+            return result.get("resumable", False)
+        return status_code >= 500 or status_code in self.RETRY_STATUSES
+    
+    def _start_upload_session(self, video_path: str, file_size: int = None) -> Dict[str, Any]:
         """
         Step 1: Start upload session
         POST /{app_id}/uploads
         """
         try:
-            file_size = os.path.getsize(video_path)
+            if file_size is None:
+                file_size = os.stat(video_path).st_size
             file_name = os.path.basename(video_path)
             
             params = {
                 'file_name': file_name,
                 'file_length': str(file_size),
                 'file_type': 'video/mp4',
-                'access_token': self.access_token
+                **self._auth_params
             }
             
-            url = f"{self.base_url}/{self.app_id}/uploads"
-            response = requests.post(url, params=params, timeout=30)
+            url = self._url_uploads
+            response = self._post_with_retry(url, params=params, timeout=30)
             
             if response.status_code == 200:
-                response_data = response.json()
+                response_data = self._json(response)
                 session_id = response_data.get('id')
                 
                 if session_id and session_id.startswith('upload:'):
@@ -207,29 +359,19 @@ class FacebookPlatform(BaseSocialPlatform):
         except Exception as e:
             return {"success": False, "error": f"Error iniciando sesión: {e}"}
     
-    def _upload_file(self, upload_session_id: str, video_path: str) -> Dict[str, Any]:
+    def _upload_file(self, upload_session_id: str, video_path: str,
+                     stream: Optional[BinaryIO] = None) -> Dict[str, Any]:
         """
         Step 2: Upload file to the session
         POST /upload:{session_id}
         """
+        import requests  # already loaded by self.session; only network errors are resumable
         try:
             url = f"{self.base_url}/{upload_session_id}"
-            
-            headers = {
-                'Authorization': f'OAuth {self.access_token}',
-                'file_offset': '0'
-            }
-            
-            with open(video_path, 'rb') as video_file:
-                response = requests.post(
-                    url,
-                    headers=headers,
-                    data=video_file,
-                    timeout=600  # 10 minutes for large files
-                )
+            response = self._post_file_body(url, video_path, 0, stream)
             
             if response.status_code == 200:
-                response_data = response.json()
+                response_data = self._json(response)
                 file_handle = response_data.get('h')
                 
                 if file_handle:
@@ -238,33 +380,135 @@ class FacebookPlatform(BaseSocialPlatform):
                         "file_handle": file_handle
                     }
                 else:
-                    return {"success": False, "error": "No se recibió identificador de archivo"}
+                    return {"success": False, "error": "No se recibió identificador de archivo",
+                            "resumable": False}
             else:
                 error_msg = f"Error subiendo archivo: {response.status_code} - {response.text}"
-                return {"success": False, "error": error_msg}
+                return {"success": False, "error": error_msg, "status_code": response.status_code}
                 
+        except TimeoutError as e:
+            return {"success": False, "error": f"Error en subida de archivo: {e}", "queue_full": True}
+        except (requests.ConnectionError, requests.Timeout) as e:
+            return {"success": False, "error": f"Error en subida de archivo: {e}", "resumable": True}
         except Exception as e:
-            return {"success": False, "error": f"Error en subida de archivo: {e}"}
+            return {"success": False, "error": f"Error en subida de archivo: {e}", "resumable": False}
+    
+    def _on_http_response(self, response, *args, **kwargs):
+        """Session response hook: track Graph API quota usage and slow down near the limit"""
+        super()._on_http_response(response, *args, **kwargs)
+        
+        if response.status_code == 401 and self.access_token:
+            with self._verified_tokens_lock:
+                self._verified_tokens.pop(self._token_key(), None)
+        
+        usage = 0
+        for header in ('X-App-Usage', 'X-Page-Usage'):
+            value = response.headers.get(header)
+            if not value:
+                continue
+            try:
+                usage = max([usage, *(v for v in loads(value).values() if isinstance(v, (int, float)))])
+            except (ValueError, AttributeError):
+                continue
+        
+        key = self.app_id or 'default'
+        now = time.monotonic()
+        with self._usage_lock:
+            if usage > self.USAGE_THRESHOLD:
+                pause = self.USAGE_MAX_PAUSE * min(usage - self.USAGE_THRESHOLD, 100 - self.USAGE_THRESHOLD) \
+                    / (100 - self.USAGE_THRESHOLD)
+                self._usage_pause_until[key] = max(self._usage_pause_until.get(key, 0.0), now + pause)
+                self.logger.warning("Uso de la Graph API al %s%%, pausando %.1fs", usage, pause)
+            wait = self._usage_pause_until.get(key, 0.0) - now
+        
+        if wait > 0:
+            time.sleep(wait)
+    
+    def _retry_delay(self, response, attempt: int) -> float:
+        """Seconds to wait before retry number `attempt` (0-based), honouring Retry-After"""
+        delay = self.RETRY_BACKOFF * (2 ** attempt)
+        if response is not None:
+            try:
+                delay = max(delay, float(response.headers.get('Retry-After', 0)))
+            except ValueError:
+                pass
+        return min(delay, self.MAX_RETRY_DELAY) + random.uniform(0, 0.25)
+    
+    def _post_with_retry(self, url: str, retry_statuses=RETRY_STATUSES, **kwargs):
+        """POST to the Graph API, retrying transient errors with exponential backoff"""
+        for attempt in range(self.MAX_RETRIES + 1):
+            response = self.session.post(url, **kwargs)
+            if response.status_code not in retry_statuses or attempt == self.MAX_RETRIES:
+                return response
+            
+            delay = self._retry_delay(response, attempt)
+            self.logger.warning("Graph API devolvió %s, reintentando en %.1fs", response.status_code, delay)
+            time.sleep(delay)
+    
+    @staticmethod
+    def _json(response) -> Any:
+        """Parse a Graph API response body (orjson when available)"""
+        return loads(response.content)
+    
+    def _post_file_body(self, url: str, video_path: str, file_offset: int = 0,
+                        stream: Optional[BinaryIO] = None):
+        """
+        POST the video from `file_offset` to the end as the raw request body
+        
+        The body is a memory map (the caller's stream, or the file mapped here),
+        sent with an explicit Content-Length so it is never chunk-encoded and
+        the kernel pages the file in as it is sent. At most FB_UPLOAD_CONCURRENCY
+        bodies are sent at once; TimeoutError if no slot frees up in time.
+        """
+        if stream is None:
+            with open(video_path, 'rb') as video_file:
+                with mmap.mmap(video_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return self._post_file_body(url, video_path, file_offset, mapped)
+        
+        stream.seek(0, os.SEEK_END)
+        length = stream.tell() - file_offset
+        stream.seek(file_offset)
+        
+        headers = {
+            'file_offset': str(file_offset),
+            'Content-Length': str(length)
+        }
+        
+        if not self._upload_slots.acquire(timeout=self.UPLOAD_QUEUE_TIMEOUT):
+            raise TimeoutError("cola de subida llena")
+        try:
+            return self.session.post(
+                url,
+                headers=headers,
+                data=stream,
+                timeout=self.UPLOAD_TIMEOUT
+            )
+        finally:
+            self._upload_slots.release()
     
     def _publish_video(self, file_handle: str, title: str, description: str) -> Dict[str, Any]:
         """
         Step 3: Publish video using the uploaded file handle
         POST /{page_id}/videos
+        
+        title and description are expected already truncated by upload_video().
         """
         try:
-            url = f"{self.video_base_url}/{self.page_id}/videos"
+            url = self._url_videos
             
             data = {
-                'access_token': self.access_token,
-                'title': title[:100],  # Facebook title limit
-                'description': description[:60000],  # Facebook description limit
+                **self._auth_params,
+                'title': title,
+                'description': description,
                 'fbuploader_video_file_chunk': file_handle
             }
             
-            response = requests.post(url, data=data, timeout=60)
+            # Only rate limits are retried here: after a 5xx the video may
+            # already be published, and retrying would post it twice
+            response = self._post_with_retry(url, retry_statuses={429}, data=data, timeout=60)
             
             if response.status_code == 200:
-                response_data = response.json()
+                response_data = self._json(response)
                 return {
                     "success": True,
                     "video_id": response_data.get('id'),
@@ -288,14 +532,10 @@ class FacebookPlatform(BaseSocialPlatform):
         try:
             url = f"{self.base_url}/{upload_session_id}"
             
-            headers = {
-                'Authorization': f'OAuth {self.access_token}'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self.session.get(url, timeout=30)
             
             if response.status_code == 200:
-                response_data = response.json()
+                response_data = self._json(response)
                 return {
                     "success": True,
                     "session_id": response_data.get('id'),
@@ -308,32 +548,19 @@ class FacebookPlatform(BaseSocialPlatform):
         except Exception as e:
             return {"success": False, "error": f"Error reanudando sesión: {e}"}
     
-    def _upload_file_with_offset(self, upload_session_id: str, video_path: str, file_offset: int) -> Dict[str, Any]:
+    def _upload_file_with_offset(self, upload_session_id: str, video_path: str, file_offset: int,
+                                 stream: Optional[BinaryIO] = None) -> Dict[str, Any]:
         """
         Upload file from a specific offset (for resumable uploads)
         POST /upload:{session_id}
         """
+        import requests  # already loaded by self.session; only network errors are resumable
         try:
             url = f"{self.base_url}/{upload_session_id}"
-            
-            headers = {
-                'Authorization': f'OAuth {self.access_token}',
-                'file_offset': str(file_offset)
-            }
-            
-            with open(video_path, 'rb') as video_file:
-                # Seek to the offset position
-                video_file.seek(file_offset)
-                
-                response = requests.post(
-                    url,
-                    headers=headers,
-                    data=video_file,
-                    timeout=600  # 10 minutes for large files
-                )
+            response = self._post_file_body(url, video_path, file_offset, stream)
             
             if response.status_code == 200:
-                response_data = response.json()
+                response_data = self._json(response)
                 file_handle = response_data.get('h')
                 
                 if file_handle:
@@ -342,13 +569,18 @@ class FacebookPlatform(BaseSocialPlatform):
                         "file_handle": file_handle
                     }
                 else:
-                    return {"success": False, "error": "No se recibió identificador de archivo"}
+                    return {"success": False, "error": "No se recibió identificador de archivo",
+                            "resumable": False}
             else:
                 error_msg = f"Error subiendo archivo con offset: {response.status_code} - {response.text}"
-                return {"success": False, "error": error_msg}
+                return {"success": False, "error": error_msg, "status_code": response.status_code}
                 
+        except TimeoutError as e:
+            return {"success": False, "error": f"Error en subida con offset: {e}", "queue_full": True}
+        except (requests.ConnectionError, requests.Timeout) as e:
+            return {"success": False, "error": f"Error en subida con offset: {e}", "resumable": True}
         except Exception as e:
-            return {"success": False, "error": f"Error en subida con offset: {e}"}
+            return {"success": False, "error": f"Error en subida con offset: {e}", "resumable": False}
     
     
     def _format_combined_text(self, title: str, description: str, hashtags: Optional[List[str]] = None) -> str:
@@ -356,33 +588,18 @@ class FacebookPlatform(BaseSocialPlatform):
         Construir un texto combinado (title + description + hashtags).
         Los hashtags deben ser formateados automáticamente con #.
         """
-        parts = []
-        
-        # Add title if provided
-        if title and title.strip():
-            parts.append(title.strip())
-        
-        # Add description if provided
-        if description and description.strip():
-            parts.append(description.strip())
-        
-        # Add hashtags if provided
-        if hashtags:
-            formatted_hashtags = []
-            for tag in hashtags:
-                tag = tag.strip()
-                if tag and not tag.startswith('#'):
-                    tag = f"#{tag}"
-                if tag:
-                    formatted_hashtags.append(tag)
-            
-            if formatted_hashtags:
-                parts.append(' '.join(formatted_hashtags))
+        title = title.strip() if title else ''
+        description = description.strip() if description else ''
         
-        # Join all parts with double newline
-        final_text = '\n\n'.join(parts)
+        # Hashtags get a leading # if they don't have one
+        tags = ' '.join(
+            tag if tag.startswith('#') else f"#{tag}"
+            for tag in (tag.strip() for tag in (hashtags or ()))
+            if tag
+        )
         
-        return final_text
+        # Join all non-empty parts with double newline
+        return '\n\n'.join(part for part in (title, description, tags) if part)
     
     
     def get_upload_status(self, upload_id: str) -> Dict[str, Any]:
@@ -400,12 +617,9 @@ class FacebookPlatform(BaseSocialPlatform):
                 if not self.authenticate():
                     return {"success": False, "error": "Authentication failed"}
             
-            params = {
-                'access_token': self.access_token,
-                'fields': 'id,title,description,created_time,permalink_url,status'
-            }
+            params = {**self._auth_params, 'fields': 'id,title,description,created_time,permalink_url,status'}
             
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/{upload_id}",
                 params=params,
                 timeout=30
@@ -414,7 +628,7 @@ class FacebookPlatform(BaseSocialPlatform):
             if response.status_code == 200:
                 return {
                     "success": True,
-                    "status_data": response.json()
+                    "status_data": self._json(response)
                 }
             else:
                 error_msg = f"Failed to get upload status: {response.status_code} - {response.text}"
@@ -425,17 +639,7 @@ class FacebookPlatform(BaseSocialPlatform):
             self.logger.error(error_msg)
             return {"success": False, "error": error_msg}
     
-    def get_supported_formats(self) -> List[str]:
-        """
-        Get supported video formats for Facebook
-        
-        Returns:
-            List of supported file extensions
-        """
-        # Facebook supports most common video formats
-        return ['.mp4', '.mov', '.avi', '.wmv', '.flv', '.webm', '.mkv', '.3gp']
-    
-    def prepare_upload_data(self, title: str, description: str, **kwargs) -> Dict[str, Any]:
+    def prepare_upload_data(self, title: str, description: str, **kwargs) -> UploadRequest:
         """
         Prepare upload data specific to Facebook
         """
@@ -446,8 +650,8 @@ class FacebookPlatform(BaseSocialPlatform):
         if hashtags and not isinstance(hashtags, list):
             hashtags = [hashtags]
         
-        upload_data['hashtags'] = hashtags
-        upload_data['combined_text'] = self._format_combined_text(title, description, hashtags)
+        upload_data.extra['hashtags'] = hashtags
+        upload_data.extra['combined_text'] = self._format_combined_text(title, description, hashtags)
         
         return upload_data
     
@@ -463,13 +667,10 @@ class FacebookPlatform(BaseSocialPlatform):
                 if not self.authenticate():
                     return {"success": False, "error": "Authentication failed"}
             
-            params = {
-                'access_token': self.access_token,
-                'fields': 'id,name,username,category,followers_count,fan_count'
-            }
+            params = {**self._auth_params, 'fields': 'id,name,username,category,followers_count,fan_count'}
             
-            response = requests.get(
-                f"{self.base_url}/{self.page_id}",
+            response = self.session.get(
+                self._url_page,
                 params=params,
                 timeout=30
             )
@@ -477,7 +678,7 @@ class FacebookPlatform(BaseSocialPlatform):
             if response.status_code == 200:
                 return {
                     "success": True,
-                    "page_info": response.json()
+                    "page_info": self._json(response)
                 }
             else:
                 error_msg = f"Failed to get page info: {response.status_code} - {response.text}"
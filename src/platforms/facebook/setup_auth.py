@@ -4,58 +4,89 @@ Facebook/Instagram OAuth 2.0 Authentication Setup for MultiPosti
 Implements complete OAuth flow to get long-lived tokens for Facebook Pages and Instagram Business
 """
 
-import json
-import requests
-import webbrowser
+import hashlib
+import sys
 import urllib.parse
+import html
+import socket
 from pathlib import Path
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import threading
 import time
 
-class OAuthHandler(BaseHTTPRequestHandler):
-    """HTTP handler to capture OAuth callback"""
-    
-    def do_GET(self):
-        """Handle GET request from OAuth callback"""
-        # Parse query parameters
-        query_params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
-        
-        if 'code' in query_params:
-            # Success - got authorization code
-            self.server.auth_code = query_params['code'][0]
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            response_html = """
-            <html><body>
-            <h2>OK: Autenticacion exitosa!</h2>
-            <p>Puedes cerrar esta ventana y volver a la terminal.</p>
-            <script>setTimeout(function(){window.close()}, 3000);</script>
-            </body></html>
-            """
-            self.wfile.write(response_html.encode('utf-8'))
-        elif 'error' in query_params:
-            # Error in OAuth flow
-            error = query_params.get('error_description', ['Unknown error'])[0]
-            self.server.auth_error = error
-            self.send_response(400)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            error_html = f"""
-            <html><body>
-            <h2>ERROR: Error en autenticacion</h2>
-            <p>{error}</p>
-            </body></html>
-            """
-            self.wfile.write(error_html.encode('utf-8'))
-        
-        # Shutdown server after handling request
-        threading.Thread(target=self.server.shutdown).start()
+# Add the src directory to Python path so we can import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.json_io import read_json, write_json
+
+# Required permissions for Facebook Pages according to official documentation
+OAUTH_SCOPE = ','.join([
+    'pages_show_list',           # List pages user manages
+    'pages_manage_posts',        # Create and manage page posts
+    'pages_manage_read_engagement',  # Read engagement data
+    'pages_manage_metadata',     # Manage page metadata
+    'publish_video'              # Required specifically for video uploads
+])
+
+SUCCESS_HTML = """
+<html><body>
+<h2>OK: Autenticacion exitosa!</h2>
+<p>Puedes cerrar esta ventana y volver a la terminal.</p>
+<script>setTimeout(function(){window.close()}, 3000);</script>
+</body></html>
+"""
+
+ERROR_HTML = """
+<html><body>
+<h2>ERROR: Error en autenticacion</h2>
+<p>{error}</p>
+</body></html>
+"""
+
+
+def _send_html(conn, status, body):
+    """Write a minimal HTTP/1.1 response and close the connection"""
+    payload = body.encode('utf-8')
+    head = (f"HTTP/1.1 {status}\r\n"
+            "Content-Type: text/html; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n")
+    conn.sendall(head.encode('ascii') + payload)
+
+
+def wait_for_oauth_callback(host='localhost', port=8080):
+    """
+    Listen for the OAuth redirect and return (auth_code, auth_error)
     
-    def log_message(self, format, *args):
-        """Suppress server logs"""
-        pass
+    A one-shot socket listener: each request line is parsed directly and the
+    listener returns as soon as a request carrying `code` or `error` arrives.
+    Other requests (e.g. /favicon.ico) get a 404 and are ignored.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as listener:
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((host, port))
+        listener.listen(1)
+        
+        while True:
+            conn, _ = listener.accept()
+            with conn:
+                request_line = conn.recv(4096).decode('latin-1').partition('\r\n')[0]
+                parts = request_line.split(' ', 2)
+                path = parts[1] if len(parts) > 1 else ''
+                query_params = urllib.parse.parse_qs(urllib.parse.urlparse(path).query)
+                
+                if 'code' in query_params:
+                    _send_html(conn, '200 OK', SUCCESS_HTML)
+                    return query_params['code'][0], None
+                
+                if 'error' in query_params:
+                    error = query_params.get('error_description', ['Unknown error'])[0]
+                    _send_html(conn, '400 Bad Request', ERROR_HTML.format(error=html.escape(error)))
+                    return None, error
+                
+                _send_html(conn, '404 Not Found', '')
+
+def _format_pages(pages):
+    """Numbered "name (ID: id)" lines for a page list, as one string"""
+    return '\n'.join(f"  {i}. {page['name']} (ID: {page['id']})" for i, page in enumerate(pages, 1))
 
 class FacebookAuthenticator:
     """Facebook/Instagram OAuth 2.0 authenticator"""
@@ -69,20 +100,43 @@ class FacebookAuthenticator:
         self.client_secret_path = self.credentials_dir / "client_secret.json"
         self.token_path = self.credentials_dir / "facebook_token.json"
         
+        # /me/accounts responses are reused for this long, per access token
+        self.pages_cache_ttl = 3600
+        
         self.app_id = None
         self.app_secret = None
         self.redirect_uri = None
         
+        self._session = None
+        
         print("Iniciando configuración de Facebook/Instagram OAuth...")
         
+    @property
+    def session(self):
+        """
+        One keep-alive connection to graph.facebook.com for the whole flow
+        
+        requests is imported on first use, so loading the credentials or
+        failing early doesn't pay for its import tree.
+        """
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            session = requests.Session()
+            retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504))
+            session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry))
+            self._session = session
+        return self._session
+    
     def load_client_credentials(self):
         """Load app credentials from client_secret.json"""
         try:
             if not self.client_secret_path.exists():
                 raise FileNotFoundError(f"Archivo de credenciales no encontrado: {self.client_secret_path}")
             
-            with open(self.client_secret_path, 'r') as f:
-                creds = json.load(f)
+            creds = read_json(self.client_secret_path)
             
             self.app_id = creds.get('app_id')
             self.app_secret = creds.get('app_secret')
@@ -102,49 +156,30 @@ class FacebookAuthenticator:
         """Start OAuth 2.0 authorization flow"""
         print("\n[STEP] Paso 1: Iniciando flujo de autorización...")
         
-        # Required permissions for Facebook Pages according to official documentation
-        scopes = [
-            'pages_show_list',           # List pages user manages
-            'pages_manage_posts',        # Create and manage page posts  
-            'pages_manage_read_engagement',  # Read engagement data
-            'pages_manage_metadata',     # Manage page metadata
-            'publish_video'              # Required specifically for video uploads
-        ]
-        
-        # Build authorization URL
-        params = {
-            'client_id': self.app_id,
-            'redirect_uri': self.redirect_uri,
-            'scope': ','.join(scopes),
-            'response_type': 'code',
-            'state': 'multiposti_auth'
-        }
-        
-        auth_url = f"{self.oauth_base}?" + urllib.parse.urlencode(params)
+        # Build authorization URL (only the app-specific values need quoting)
+        auth_url = (f"{self.oauth_base}?client_id={urllib.parse.quote(str(self.app_id), safe='')}"
+                    f"&redirect_uri={urllib.parse.quote(self.redirect_uri, safe='')}"
+                    f"&scope={OAUTH_SCOPE}&response_type=code&state=multiposti_auth")
         
         print(f"[BROWSER] Abriendo navegador para autorización...")
         print(f"Si no se abre automáticamente, visita: {auth_url}")
         
-        # Start local server to capture callback
-        server = HTTPServer(('localhost', 8080), OAuthHandler)
-        server.auth_code = None
-        server.auth_error = None
-        
         # Open browser
+        import webbrowser
         webbrowser.open(auth_url)
         
         print("[WAIT] Esperando autorización... (autoriza la aplicación en el navegador)")
         
-        # Handle the OAuth callback
-        server.handle_request()
+        # Capture the OAuth callback on the local port
+        auth_code, auth_error = wait_for_oauth_callback('localhost', 8080)
         
-        if hasattr(server, 'auth_error') and server.auth_error:
-            print(f"ERROR: Error en autorización: {server.auth_error}")
+        if auth_error:
+            print(f"ERROR: Error en autorización: {auth_error}")
             return None
         
-        if hasattr(server, 'auth_code') and server.auth_code:
+        if auth_code:
             print("OK: Código de autorización recibido")
-            return server.auth_code
+            return auth_code
         
         print("ERROR: No se recibió código de autorización")
         return None
@@ -161,7 +196,7 @@ class FacebookAuthenticator:
                 'code': auth_code
             }
             
-            response = requests.get(f"{self.base_url}/oauth/access_token", params=params)
+            response = self.session.get(f"{self.base_url}/oauth/access_token", params=params)
             
             if response.status_code == 200:
                 data = response.json()
@@ -193,7 +228,7 @@ class FacebookAuthenticator:
                 'fb_exchange_token': short_token
             }
             
-            response = requests.get(f"{self.base_url}/oauth/access_token", params=params)
+            response = self.session.get(f"{self.base_url}/oauth/access_token", params=params)
             
             if response.status_code == 200:
                 data = response.json()
@@ -214,26 +249,62 @@ class FacebookAuthenticator:
             print(f"ERROR: Error convirtiendo token: {e}")
             return None
     
+    def _pages_cache_path(self, access_token):
+        """Cache file for the /me/accounts response of a given access token"""
+        token_key = hashlib.blake2b(access_token.encode('utf-8'), digest_size=8).hexdigest()
+        return self.credentials_dir / f"pages_cache_{token_key}.json"
+    
+    def _load_cached_pages(self, access_token):
+        """Return the cached page list for a token, or None if missing or older than pages_cache_ttl"""
+        cache_path = self._pages_cache_path(access_token)
+        try:
+            if time.time() - cache_path.stat().st_mtime >= self.pages_cache_ttl:
+                return None
+            return read_json(cache_path)
+        except (OSError, ValueError):
+            return None
+    
+    def _save_cached_pages(self, access_token, pages):
+        """
+        Atomically write the page list for a token to its cache file
+        
+        The cache only saves the /me/accounts call, so page access tokens are
+        left out, and cache files of earlier tokens are deleted.
+        """
+        cache_path = self._pages_cache_path(access_token)
+        try:
+            self.credentials_dir.mkdir(parents=True, exist_ok=True)
+            write_json(cache_path, [{k: v for k, v in page.items() if k != 'access_token'}
+                                    for page in pages])
+            for old_path in self.credentials_dir.glob('pages_cache_*.json'):
+                if old_path != cache_path:
+                    old_path.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"Aviso: no se pudo guardar la caché de páginas: {e}")
+    
     def get_user_pages(self, access_token):
         """Get Facebook pages managed by user"""
         print("\n[STEP 4] Obteniendo páginas de Facebook...")
         
         try:
+            pages = self._load_cached_pages(access_token)
+            if pages:
+                print(f"OK: Se encontraron {len(pages)} páginas (caché)")
+                return pages
+            
             params = {
                 'access_token': access_token
             }
             
-            response = requests.get(f"{self.base_url}/me/accounts", params=params)
+            response = self.session.get(f"{self.base_url}/me/accounts", params=params)
             
             if response.status_code == 200:
                 data = response.json()
                 pages = data.get('data', [])
                 
                 if pages:
-                    print(f"OK: Se encontraron {len(pages)} páginas:")
-                    for i, page in enumerate(pages):
-                        print(f"  {i+1}. {page['name']} (ID: {page['id']})")
-                    
+                    self._save_cached_pages(access_token, pages)
+                    print(f"OK: Se encontraron {len(pages)} páginas")
                     return pages
                 else:
                     print("ERROR: No se encontraron páginas. Asegúrate de tener páginas de Facebook administradas.")
@@ -256,7 +327,7 @@ class FacebookAuthenticator:
             print(f"📄 Usando única página disponible: {selected_page['name']}")
             return selected_page
         
-        print(f"\n📋 Selecciona una página para usar con MultiPosti:")
+        print(f"\n📋 Selecciona una página para usar con MultiPosti:\n{_format_pages(pages)}")
         
         while True:
             try:
@@ -290,8 +361,7 @@ class FacebookAuthenticator:
                 'created_at': time.time()
             }
             
-            with open(self.token_path, 'w') as f:
-                json.dump(token_data, f, indent=2)
+            write_json(self.token_path, token_data)
             
             print(f"OK: Credenciales guardadas en: {self.token_path}")
             return True
@@ -1,8 +1,11 @@
 import json
-import requests
+import mimetypes
+import os
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any, Optional, List
-from core.base_platform import BaseSocialPlatform
+from typing import Dict, Any, Optional, List, BinaryIO, Tuple
+from core.base_platform import BaseSocialPlatform, UploadRequest
 
 
 class TikTokPlatform(BaseSocialPlatform):
@@ -10,12 +13,32 @@ class TikTokPlatform(BaseSocialPlatform):
     TikTok platform implementation using Content Posting API
     """
     
+    SUPPORTED_FORMATS = frozenset({'.mp4', '.mov', '.mpeg', '.3gp', '.avi'})
+    
+    # (connect, read) timeout for the video PUT: a dead socket fails after the
+    # read timeout instead of hiding behind one 5 minute umbrella
+    UPLOAD_TIMEOUT = (10, 300)
+    
+    # Videos are PUT in chunks with Content-Range so a failed request only
+    # re-sends one chunk; the remainder is merged into the last chunk
+    CHUNK_SIZE = 10 * 1024 * 1024
+    
+    # Tokens are renewed this many seconds before they expire; until then
+    # authenticate() trusts the saved token without calling the API
+    REFRESH_MARGIN = 300
+    MIN_REFRESH_INTERVAL = 60
+    
     def __init__(self, credentials_manager):
         super().__init__(credentials_manager)
         self.base_url = "https://open.tiktokapis.com"
         self.access_token = None
         self.open_id = None
         
+        # Background refresher, started after the first successful authentication
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread = None
+        self._stop_refresh = threading.Event()
+        
     def get_platform_name(self) -> str:
         """Return platform name"""
         return "tiktok"
@@ -40,9 +63,21 @@ class TikTokPlatform(BaseSocialPlatform):
                     self.logger.error(f"Missing required field in token: {field}")
                     return False
             
+            expires_at = self._token_expires_at(token_data)
+            if expires_at is not None and time.time() >= expires_at - self.REFRESH_MARGIN:
+                token_data = self._refresh_token() or token_data
+                expires_at = self._token_expires_at(token_data)
+            
             self.access_token = token_data['access_token']
             self.open_id = token_data['open_id']
             
+            # A token well inside its lifetime is trusted without a network round-trip
+            if expires_at is not None and time.time() < expires_at - self.REFRESH_MARGIN:
+                self._authenticated = True
+                self._start_refresher()
+                self.logger.info("TikTok authentication successful (saved token)")
+                return True
+            
             # Test authentication by making a simple API call
             if self._test_authentication():
                 self._authenticated = True
@@ -56,6 +91,92 @@ class TikTokPlatform(BaseSocialPlatform):
             self.logger.error(f"Error during TikTok authentication: {e}")
             return False
     
+    @staticmethod
+    def _token_expires_at(token_data: Dict[str, Any]) -> Optional[float]:
+        """Expiry of a saved token as epoch seconds, or None if it was saved without one"""
+        try:
+            return float(token_data['expires_at'])
+        except (KeyError, TypeError, ValueError):
+            return None
+    
+    def _refresh_token(self) -> Optional[Dict[str, Any]]:
+        """
+        Renew the access token with the saved refresh_token
+        
+        Serialized by _refresh_lock: a caller that waited on the lock re-reads
+        the token file and skips the request if another thread already renewed it.
+        
+        Returns:
+            Dict or None: The new token data, or None if it could not be refreshed
+        """
+        with self._refresh_lock:
+            token_data = self.load_token() or {}
+            expires_at = self._token_expires_at(token_data)
+            if expires_at is not None and time.time() < expires_at - self.REFRESH_MARGIN:
+                return token_data
+            
+            app_credentials = self.credentials_manager.load_credentials(self.platform_name, "client_secret.json") or {}
+            client_key = app_credentials.get('client_key')
+            client_secret = app_credentials.get('client_secret')
+            refresh_token = token_data.get('refresh_token')
+            if not (client_key and client_secret and refresh_token):
+                self.logger.warning("Cannot refresh TikTok token: missing client credentials or refresh_token")
+                return None
+            
+            try:
+                response = self.session.post(
+                    f"{self.base_url}/v2/oauth/token/",
+                    data={
+                        'client_key': client_key,
+                        'client_secret': client_secret,
+                        'grant_type': 'refresh_token',
+                        'refresh_token': refresh_token
+                    },
+                    timeout=30
+                )
+                if response.status_code != 200:
+                    self.logger.error("TikTok token refresh failed: %s - %s", response.status_code, response.text)
+                    return None
+                
+                new_token = {**token_data, **response.json()}
+                if new_token.get('expires_in'):
+                    new_token['expires_at'] = time.time() + float(new_token['expires_in'])
+                if not self.save_token(new_token):
+                    return None
+                
+                self.access_token = new_token.get('access_token', self.access_token)
+                self.logger.info("TikTok token refreshed")
+                return new_token
+                
+            except Exception as e:
+                self.logger.error("Error refreshing TikTok token: %s", e)
+                return None
+    
+    def _start_refresher(self):
+        """Start the daemon thread that renews the token before it expires (once per instance)"""
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        self._stop_refresh.clear()
+        self._refresh_thread = threading.Thread(target=self._refresh_loop, name="tiktok-token-refresh", daemon=True)
+        self._refresh_thread.start()
+    
+    def _refresh_loop(self):
+        """Sleep until REFRESH_MARGIN seconds before expiry, refresh, repeat until close()"""
+        while True:
+            expires_at = self._token_expires_at(self.load_token() or {})
+            if expires_at is None:
+                return
+            
+            delay = max(self.MIN_REFRESH_INTERVAL, expires_at - time.time() - self.REFRESH_MARGIN)
+            if self._stop_refresh.wait(delay):
+                return
+            self._refresh_token()
+    
+    def close(self):
+        """Stop the token refresher and close the HTTP session"""
+        self._stop_refresh.set()
+        super().close()
+    
     def _test_authentication(self) -> bool:
         """
         Test if current access token is valid
@@ -67,7 +188,7 @@ class TikTokPlatform(BaseSocialPlatform):
             }
             
             # Use user info endpoint to test auth
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/v2/user/info/",
                 headers=headers,
                 params={'fields': 'open_id,username'},
@@ -80,7 +201,8 @@ class TikTokPlatform(BaseSocialPlatform):
             self.logger.error(f"Authentication test failed: {e}")
             return False
     
-    def upload_video(self, video_path: str, title: str, description: str, hashtags: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
+    def upload_video(self, video_path: str, title: str, description: str, hashtags: Optional[List[str]] = None,
+                     stream: Optional[BinaryIO] = None, **kwargs) -> Dict[str, Any]:
         """
         Upload video to TikTok using the Content Posting API
         
@@ -89,6 +211,7 @@ class TikTokPlatform(BaseSocialPlatform):
             title: Video title
             description: Video description
             hashtags: List of hashtags (optional)
+            stream: Pre-opened binary stream of the video (optional)
         
         Returns:
             Dict containing upload result
@@ -99,16 +222,20 @@ class TikTokPlatform(BaseSocialPlatform):
                 if not self.authenticate():
                     return {"success": False, "error": "Authentication failed"}
             
-            if not self.validate_video_file(video_path):
+            video_stat = self._stat_video_file(video_path)
+            if video_stat is None:
                 return {"success": False, "error": "Invalid video file"}
             
             # Prepare upload data
-            upload_data = self.prepare_upload_data(title, description, hashtags=hashtags)
+            upload_data = self.prepare_upload_data(title, description, hashtags=hashtags,
+                                                   batch_timestamp=kwargs.get('batch_timestamp'),
+                                                   video_stat=video_stat)
             self.log_upload_attempt(video_path, upload_data)
             
             # Step 1: Initialize upload session
             print("Inicializando subida...")
-            init_response = self._initialize_upload()
+            video_size = upload_data.extra['file_size']
+            init_response = self._initialize_upload(video_size)
             if not init_response.get('success'):
                 return init_response
             
@@ -117,7 +244,7 @@ class TikTokPlatform(BaseSocialPlatform):
             
             # Step 2: Upload video file
             print("Subiendo archivo de video...")
-            upload_response = self._upload_file(upload_url, video_path)
+            upload_response = self._upload_file(upload_url, video_path, stream, video_size)
             if not upload_response.get('success'):
                 return upload_response
             
@@ -125,7 +252,7 @@ class TikTokPlatform(BaseSocialPlatform):
             
             # Step 3: Publish video
             print("Publicando video...")
-            final_description = self._format_description(title, description, hashtags)
+            final_description = upload_data.extra['formatted_description']
             publish_response = self._publish_video(video_id, final_description)
             
             if publish_response.get('success'):
@@ -147,7 +274,18 @@ class TikTokPlatform(BaseSocialPlatform):
             self.logger.error(error_msg)
             return {"success": False, "error": error_msg}
     
-    def _initialize_upload(self) -> Dict[str, Any]:
+    def _chunk_plan(self, video_size: int) -> Tuple[int, int]:
+        """
+        Return (chunk_size, total_chunk_count) for a video
+        
+        Videos up to CHUNK_SIZE go in a single chunk; larger ones are split
+        into CHUNK_SIZE chunks with the remainder added to the last one.
+        """
+        if video_size <= self.CHUNK_SIZE:
+            return video_size, 1
+        return self.CHUNK_SIZE, video_size // self.CHUNK_SIZE
+    
+    def _initialize_upload(self, video_size: int) -> Dict[str, Any]:
         """
         Step 1: Initialize upload session with TikTok
         """
@@ -157,12 +295,16 @@ class TikTokPlatform(BaseSocialPlatform):
                 'Content-Type': 'application/json'
             }
             
+            chunk_size, total_chunk_count = self._chunk_plan(video_size)
             data = {
                 "source": "file",
-                "upload_type": "video"
+                "upload_type": "video",
+                "video_size": video_size,
+                "chunk_size": chunk_size,
+                "total_chunk_count": total_chunk_count
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/v2/video/init/",
                 headers=headers,
                 json=data,
@@ -186,30 +328,57 @@ class TikTokPlatform(BaseSocialPlatform):
             self.logger.error(error_msg)
             return {"success": False, "error": error_msg}
     
-    def _upload_file(self, upload_url: str, video_path: str) -> Dict[str, Any]:
+    def _upload_file(self, upload_url: str, video_path: str, stream: Optional[BinaryIO] = None,
+                     video_size: Optional[int] = None) -> Dict[str, Any]:
         """
-        Step 2: Upload video file to TikTok's storage
+        Step 2: Upload video file to TikTok's storage, one Content-Range chunk at a time
         """
         try:
+            content_type = mimetypes.guess_type(video_path)[0] or 'video/mp4'
+            if stream is not None:
+                return self._upload_chunks(upload_url, stream, content_type, video_size)
             with open(video_path, 'rb') as video_file:
-                response = requests.put(
-                    upload_url,
-                    data=video_file,
-                    timeout=300  # 5 minutes for large files
-                )
-            
-            if response.status_code in [200, 201]:
-                return {"success": True}
-            else:
-                error_msg = f"Failed to upload file: {response.status_code} - {response.text}"
-                self.logger.error(error_msg)
-                return {"success": False, "error": error_msg}
+                return self._upload_chunks(upload_url, video_file, content_type, video_size)
                 
         except Exception as e:
             error_msg = f"Error uploading file: {e}"
             self.logger.error(error_msg)
             return {"success": False, "error": error_msg}
     
+    def _upload_chunks(self, upload_url: str, body: BinaryIO, content_type: str,
+                       video_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        PUT a seekable binary body in Content-Range chunks
+        
+        Only one chunk is held in memory at a time. Each PUT is idempotent, so
+        the session retries a failed chunk on its own (5xx, 429, dropped
+        connections) without re-sending the ones already accepted.
+        """
+        if video_size is None:
+            video_size = body.seek(0, os.SEEK_END)
+        chunk_size, total_chunk_count = self._chunk_plan(video_size)
+        
+        for index in range(total_chunk_count):
+            start = index * chunk_size
+            end = video_size if index == total_chunk_count - 1 else start + chunk_size
+            body.seek(start)
+            chunk = body.read(end - start)
+            
+            headers = {
+                'Content-Length': str(len(chunk)),
+                'Content-Range': f"bytes {start}-{end - 1}/{video_size}",
+                'Content-Type': content_type
+            }
+            response = self.session.put(upload_url, data=chunk, headers=headers, timeout=self.UPLOAD_TIMEOUT)
+            
+            if response.status_code not in (200, 201, 206):
+                error_msg = (f"Failed to upload chunk {index + 1}/{total_chunk_count}: "
+                             f"{response.status_code} - {response.text}")
+                self.logger.error(error_msg)
+                return {"success": False, "error": error_msg}
+        
+        return {"success": True}
+    
     def _publish_video(self, video_id: str, description: str) -> Dict[str, Any]:
         """
         Step 3: Publish the uploaded video
@@ -225,7 +394,7 @@ class TikTokPlatform(BaseSocialPlatform):
                 "description": description[:2200]  # TikTok limit: 2200 characters
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/v2/video/publish/",
                 headers=headers,
                 json=data,
@@ -264,16 +433,10 @@ class TikTokPlatform(BaseSocialPlatform):
         
         # Add hashtags if provided
         if hashtags:
-            formatted_hashtags = []
-            for tag in hashtags:
-                tag = tag.strip()
-                if tag and not tag.startswith('#'):
-                    tag = f"#{tag}"
-                if tag:
-                    formatted_hashtags.append(tag)
-            
-            if formatted_hashtags:
-                parts.append(' '.join(formatted_hashtags))
+            tags_str = ' '.join(tag if tag.startswith('#') else f"#{tag}"
+                                for tag in (tag.strip() for tag in hashtags) if tag)
+            if tags_str:
+                parts.append(tags_str)
         
         # Join all parts with double newline
         final_description = '\n\n'.join(parts)
@@ -304,7 +467,7 @@ class TikTokPlatform(BaseSocialPlatform):
                 'Content-Type': 'application/json'
             }
             
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/v2/video/list/",
                 headers=headers,
                 params={'fields': 'id,title,create_time,share_url,embed_html'},
@@ -325,27 +488,24 @@ class TikTokPlatform(BaseSocialPlatform):
             self.logger.error(error_msg)
             return {"success": False, "error": error_msg}
     
-    def get_supported_formats(self) -> List[str]:
-        """
-        Get supported video formats for TikTok
-        
-        Returns:
-            List of supported file extensions
-        """
-        return ['.mp4', '.mov', '.mpeg', '.3gp', '.avi']
-    
-    def prepare_upload_data(self, title: str, description: str, **kwargs) -> Dict[str, Any]:
+    def prepare_upload_data(self, title: str, description: str, **kwargs) -> UploadRequest:
         """
         Prepare upload data specific to TikTok
         """
+        video_stat = kwargs.pop('video_stat', None)
         upload_data = super().prepare_upload_data(title, description, **kwargs)
         
+        # File metadata from the validation stat(), so the upload never stats the file again
+        if video_stat is not None:
+            upload_data.extra['file_size'] = video_stat.st_size
+            upload_data.extra['file_mtime'] = video_stat.st_mtime
+        
         # TikTok-specific validation
         hashtags = kwargs.get('hashtags', [])
         if hashtags and not isinstance(hashtags, list):
             hashtags = [hashtags]
         
-        upload_data['hashtags'] = hashtags
-        upload_data['formatted_description'] = self._format_description(title, description, hashtags)
+        upload_data.extra['hashtags'] = hashtags
+        upload_data.extra['formatted_description'] = self._format_description(title, description, hashtags)
         
         return upload_data
\ No newline at end of file
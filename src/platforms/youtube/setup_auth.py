@@ -2,6 +2,7 @@
 YouTube Authentication Setup Script
 """
 
+import argparse
 import sys
 import os
 from pathlib import Path
@@ -13,9 +14,14 @@ sys.path.insert(0, str(src_path))
 from core.credentials_manager import CredentialsManager
 from platforms.youtube.youtube_platform import YouTubePlatform
 
-def setup_youtube_authentication():
+def setup_youtube_authentication(interactive: bool = True):
     """
     Interactive setup for YouTube authentication
+    
+    Args:
+        interactive: Wait for the user to place a missing client_secret.json
+                     and run the browser OAuth flow; when False, only an
+                     existing (or refreshable) token is accepted
     """
     print("=== YOUTUBE AUTHENTICATION SETUP ===")
     print()
@@ -25,7 +31,7 @@ def setup_youtube_authentication():
     youtube = YouTubePlatform(credentials_manager)
     
     # Check if client_secret.json exists
-    client_secret_path = youtube.get_credentials_path() / 'client_secret.json'
+    client_secret_path = youtube.client_secrets_file
     
     if not client_secret_path.exists():
         print("STEP 1: Client Secret File Missing")
@@ -42,6 +48,10 @@ def setup_youtube_authentication():
         print("6. Place it in the credentials/youtube/ folder")
         print()
         
+        if not interactive:
+            print("ERROR: client_secret.json not found (non-interactive mode)")
+            return False
+        
         input("Press Enter after you've placed the client_secret.json file...")
         
         if not client_secret_path.exists():
@@ -51,14 +61,17 @@ def setup_youtube_authentication():
     print("STEP 2: Authentication Process")
     print("=" * 40)
     print("Starting OAuth 2.0 authentication...")
-    print("- Your browser will open")
-    print("- Sign in to your Google account")
-    print("- Grant permissions to your application")
-    print("- Return to this terminal when complete")
+    if interactive:
+        print("- Your browser will open")
+        print("- Sign in to your Google account")
+        print("- Grant permissions to your application")
+        print("- Return to this terminal when complete")
+    else:
+        print("- Non-interactive mode: using the saved token only")
     print()
     
     # Attempt authentication
-    success = youtube.authenticate()
+    success = youtube.authenticate(interactive=interactive)
     
     if success:
         print()
@@ -86,6 +99,9 @@ def setup_youtube_authentication():
 def test_authentication():
     """
     Test that authentication is working
+    
+    Only the saved token is checked (refreshing it if expired); the browser
+    OAuth flow is never started.
     """
     print("=== TESTING AUTHENTICATION ===")
     
@@ -99,7 +115,7 @@ def test_authentication():
         return False
     
     # Test authentication
-    if youtube.authenticate():
+    if youtube.authenticate(interactive=False):
         print("✓ Authentication test successful")
         print(f"✓ Platform: {youtube}")
         return True
@@ -107,10 +123,29 @@ def test_authentication():
         print("✗ Authentication test failed")
         return False
 
-def main():
+def main(argv=None):
     """
     Main setup function
+    
+    With --setup or --test the action runs once and the exit code reports
+    the result; without them an interactive menu is shown.
     """
+    parser = argparse.ArgumentParser(description="YouTube authentication setup for MultiPosti")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument('--setup', action='store_true', help='Set up new authentication')
+    action.add_argument('--test', action='store_true', help='Test existing authentication')
+    parser.add_argument('--non-interactive', action='store_true',
+                        help='Never wait for input or open a browser; fail if client_secret.json '
+                             'or a valid token is missing')
+    args = parser.parse_args(argv)
+    
+    if args.setup:
+        return 0 if setup_youtube_authentication(interactive=not args.non_interactive) else 1
+    if args.test:
+        return 0 if test_authentication() else 1
+    if args.non_interactive:
+        parser.error("--non-interactive needs --setup or --test")
+    
     print("YOUTUBE PLATFORM SETUP")
     print("=" * 50)
     print()
@@ -142,6 +177,8 @@ def main():
         print()
         print("-" * 50)
         print()
+    
+    return 0
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
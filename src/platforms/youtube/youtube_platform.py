@@ -1,6 +1,10 @@
 import os
-import json
-from typing import Dict, Any, Optional, List
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, BinaryIO, Union
 from pathlib import Path
 
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -8,9 +12,56 @@ from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaIoBaseUpload
+
+from core.base_platform import BaseSocialPlatform, UploadRequest
+from core.json_io import loads
+
+
+class _PrefetchingMediaUpload(MediaIoBaseUpload):
+    """
+    Chunked media upload that reads the next chunk while the current one is sent
+    
+    googleapiclient asks for one chunk at a time through getbytes(). Every
+    read runs on a single worker thread, and after handing out a chunk the
+    following one is read ahead, so disk reads overlap the HTTP request
+    instead of alternating with it. A request for a different offset (the
+    server kept only part of a chunk) just reads that range directly.
+    """
+    
+    def __init__(self, fd, mimetype, chunksize, resumable=True):
+        super().__init__(fd, mimetype, chunksize=chunksize, resumable=resumable)
+        self._reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='youtube-prefetch')
+        self._prefetched = None  # (begin, length, future)
+    
+    def has_stream(self):
+        # Make next_chunk() go through getbytes() instead of slicing the stream
+        return False
+    
+    def _read(self, begin, length):
+        self._fd.seek(begin)
+        return self._fd.read(length)
+    
+    def getbytes(self, begin, length):
+        prefetched, self._prefetched = self._prefetched, None
+        if prefetched is not None and prefetched[:2] == (begin, length):
+            data = prefetched[2].result()
+        else:
+            if prefetched is not None:
+                prefetched[2].cancel()
+            data = self._reader.submit(self._read, begin, length).result()
+        
+        next_begin = begin + len(data)
+        if next_begin < self.size():
+            self._prefetched = (next_begin, length,
+                                self._reader.submit(self._read, next_begin, length))
+        return data
+    
+    def close(self):
+        """Stop the reader thread (the file itself belongs to the caller)"""
+        self._prefetched = None
+        self._reader.shutdown(wait=True, cancel_futures=True)
 
-from core.base_platform import BaseSocialPlatform
 
 class YouTubePlatform(BaseSocialPlatform):
     """
@@ -20,43 +71,87 @@ class YouTubePlatform(BaseSocialPlatform):
     # YouTube API scopes
     SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
     
+    SUPPORTED_FORMATS = frozenset({'.mp4', '.mov', '.avi', '.wmv', '.flv', '.webm', '.mkv'})
+    
+    # The access token is refreshed in the background this many seconds before it expires
+    REFRESH_MARGIN = 300
+    
+    # Resumable upload chunk size: a multiple of YouTube's 256 KiB minimum, so only
+    # one chunk is buffered and a failed request re-sends one chunk, not the whole video
+    UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+    
+    # Resource parts sent with videos.insert; must match the keys of _build_body()
+    _UPLOAD_PARTS = 'snippet,status'
+    
+    # Statuses retried by _resumable_upload, and the longest wait between attempts
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    MAX_RETRY_DELAY = 60
+    
+    # Retries per chunk, and across the whole upload so a flapping upload still ends
+    MAX_RETRIES = 3
+    MAX_TOTAL_RETRIES = 10
+    
+    # videos.list accepts at most 50 IDs per call
+    STATUS_BATCH_SIZE = 50
+    
     def __init__(self, credentials_manager):
         """Initialize YouTube platform"""
         super().__init__(credentials_manager)
         self.youtube_service = None
-        self.client_secrets_file = None
+        self.client_secrets_file: Path = self._creds_dir / 'client_secret.json'
+        self._token_path: Path = self._creds_dir / f"{self.platform_name}_token.json"
+        # Set once client_secret.json has been seen, so later calls skip the stat
+        self._client_secret_found = False
+        # mtime_ns of the token file self._credentials was built from
+        self._creds_mtime = None
+        self._refresh_lock = threading.Lock()
+        self._refresh_timer = None
     
     def get_platform_name(self) -> str:
         """Return platform name"""
         return 'youtube'
     
-    def authenticate(self) -> bool:
+    def authenticate(self, interactive: bool = True) -> bool:
         """
         Authenticate with YouTube using OAuth 2.0
         
+        Args:
+            interactive: Run the browser OAuth flow when there is no valid or
+                         refreshable token; when False, fail right away instead
+        
         Returns:
             bool: True if authentication successful
         """
         try:
-            # Get client secrets file path
-            self.client_secrets_file = self.get_credentials_path() / 'client_secret.json'
+            # Reuse the live credentials while they are valid and the token file is unchanged
+            token_mtime = self._token_mtime()
+            if (self._credentials is not None and self._credentials.valid
+                    and self.youtube_service is not None and token_mtime == self._creds_mtime):
+                self._authenticated = True
+                return True
             
-            if not self.client_secrets_file.exists():
-                self.logger.error(f"Client secrets file not found: {self.client_secrets_file}")
-                return False
+            if not self._client_secret_found:
+                if not self.client_secrets_file.exists():
+                    self.logger.error(f"Client secrets file not found: {self.client_secrets_file}")
+                    return False
+                self._client_secret_found = True
             
             creds = None
             
             # Load existing token
             token_data = self.load_token()
             if token_data:
-                creds = Credentials.from_authorized_user_info(token_data, self.SCOPES)
+                creds = self._creds_from_dict(token_data)
             
             # If no valid credentials, get new ones
             if not creds or not creds.valid:
                 if creds and creds.expired and creds.refresh_token:
                     self.logger.info("Refreshing expired token...")
-                    creds.refresh(Request())
+                    with self._refresh_lock:
+                        creds.refresh(Request())
+                elif not interactive:
+                    self.logger.error("No valid or refreshable YouTube token found (non-interactive mode)")
+                    return False
                 else:
                     self.logger.info("Starting OAuth flow...")
                     flow = InstalledAppFlow.from_client_secrets_file(
@@ -64,21 +159,18 @@ class YouTubePlatform(BaseSocialPlatform):
                     creds = flow.run_local_server(port=0, open_browser=True)
                 
                 # Save the credentials
-                token_data = {
-                    'token': creds.token,
-                    'refresh_token': creds.refresh_token,
-                    'token_uri': creds.token_uri,
-                    'client_id': creds.client_id,
-                    'client_secret': creds.client_secret,
-                    'scopes': creds.scopes
-                }
-                self.save_token(token_data)
+                self.save_token(self._creds_to_dict(creds))
+                token_mtime = self._token_mtime()
                 self.logger.info("Token saved successfully")
             
-            # Build YouTube service
-            self.youtube_service = build('youtube', 'v3', credentials=creds)
+            # Build YouTube service from the discovery document bundled with
+            # googleapiclient: no HTTPS fetch, and no file cache to read or write
+            self.youtube_service = build('youtube', 'v3', credentials=creds,
+                                         static_discovery=True, cache_discovery=False)
             self._authenticated = True
             self._credentials = creds
+            self._creds_mtime = token_mtime
+            self.schedule_refresh()
             
             self.logger.info("YouTube authentication successful")
             return True
@@ -88,7 +180,88 @@ class YouTubePlatform(BaseSocialPlatform):
             self._authenticated = False
             return False
     
-    def upload_video(self, video_path: str, title: str, description: str, **kwargs) -> Dict[str, Any]:
+    @staticmethod
+    def _creds_to_dict(creds: Credentials) -> Dict[str, Any]:
+        """
+        Token data for a Credentials object, as google-auth serializes it
+        
+        Credentials.to_json() carries every field from_authorized_user_info()
+        reads back (token, refresh_token, expiry, ...).
+        """
+        return loads(creds.to_json())
+    
+    def _creds_from_dict(self, token_data: Dict[str, Any]) -> Credentials:
+        """Build Credentials from token data saved by _creds_to_dict()"""
+        return Credentials.from_authorized_user_info(token_data, self.SCOPES)
+    
+    def schedule_refresh(self):
+        """
+        Refresh the access token REFRESH_MARGIN seconds before it expires
+        
+        Runs on a daemon threading.Timer so an expiring token never costs an
+        upload the round-trip to Google's token endpoint. Replaces any timer
+        already scheduled; does nothing for credentials without an expiry
+        or refresh token.
+        """
+        creds = self._credentials
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+        
+        if creds is None or not creds.expiry or not creds.refresh_token:
+            return
+        
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        delay = max(0.0, (creds.expiry - now).total_seconds() - self.REFRESH_MARGIN)
+        self._refresh_timer = threading.Timer(delay, self._background_refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+    
+    def _background_refresh(self):
+        """Timer callback: refresh the live credentials, save them and schedule the next refresh"""
+        creds = self._credentials
+        if creds is None:
+            return
+        
+        try:
+            with self._refresh_lock:
+                creds.refresh(Request())
+                self.save_token(self._creds_to_dict(creds))
+                self._creds_mtime = self._token_mtime()
+            self.logger.info("YouTube token refreshed in background")
+        except Exception as e:
+            # authenticate() falls back to refreshing on demand
+            self.logger.warning("Background YouTube token refresh failed: %s", e)
+            return
+        
+        self.schedule_refresh()
+    
+    def invalidate(self):
+        """Drop the live credentials and service so the next authenticate() runs the full flow"""
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+        self._authenticated = False
+        self._credentials = None
+        self.youtube_service = None
+        self._creds_mtime = None
+    
+    def close(self):
+        """Cancel the scheduled token refresh and close the HTTP session"""
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+        super().close()
+    
+    def _token_mtime(self) -> Optional[int]:
+        """mtime_ns of the saved token file, or None if there is none"""
+        try:
+            return os.stat(self._token_path).st_mtime_ns
+        except OSError:
+            return None
+    
+    def upload_video(self, video_path: str, title: str, description: str,
+                     stream: Optional[BinaryIO] = None, **kwargs) -> Dict[str, Any]:
         """
         Upload video to YouTube
         
@@ -96,6 +269,7 @@ class YouTubePlatform(BaseSocialPlatform):
             video_path: Path to video file
             title: Video title
             description: Video description
+            stream: Pre-opened binary stream of the video (optional)
             **kwargs: Additional parameters (tags, privacy, category_id, etc.)
         
         Returns:
@@ -112,36 +286,32 @@ class YouTubePlatform(BaseSocialPlatform):
             upload_data = self.prepare_upload_data(title, description, **kwargs)
             self.log_upload_attempt(video_path, upload_data)
             
-            # Build video metadata
-            body = {
-                'snippet': {
-                    'title': upload_data['title'],
-                    'description': upload_data['description'],
-                    'tags': upload_data.get('tags', []),
-                    'categoryId': upload_data.get('category_id', '22')  # Default: People & Blogs
-                },
-                'status': {
-                    'privacyStatus': upload_data.get('privacy', 'private'),  # private, public, unlisted
-                    'selfDeclaredMadeForKids': upload_data.get('made_for_kids', False)
-                }
-            }
-            
-            # Create media upload
-            media = MediaFileUpload(
-                video_path,
-                chunksize=-1,  # Upload in a single chunk
-                resumable=True,
-                mimetype='video/*'
-            )
-            
-            # Execute upload
-            insert_request = self.youtube_service.videos().insert(
-                part=','.join(body.keys()),
-                body=body,
-                media_body=media
-            )
-            
-            response = self._resumable_upload(insert_request)
+            # Create media upload; chunk N+1 is read from disk while chunk N is sent
+            video_file = None
+            if stream is None:
+                video_file = stream = open(video_path, 'rb')
+            media = None
+            try:
+                media = _PrefetchingMediaUpload(
+                    stream,
+                    mimetype='video/*',
+                    chunksize=self.UPLOAD_CHUNK_SIZE,
+                    resumable=True
+                )
+                
+                # Execute upload
+                insert_request = self.youtube_service.videos().insert(
+                    part=self._UPLOAD_PARTS,
+                    body=self._build_body(upload_data),
+                    media_body=media
+                )
+                
+                response = self._resumable_upload(insert_request)
+            finally:
+                if media is not None:
+                    media.close()
+                if video_file is not None:
+                    video_file.close()
             
             if response:
                 result = {
@@ -169,87 +339,150 @@ class YouTubePlatform(BaseSocialPlatform):
             self.logger.error(error_msg)
             return {'success': False, 'error': error_msg}
     
-    def get_upload_status(self, upload_id: str) -> Dict[str, Any]:
+    @staticmethod
+    def _build_body(upload_data: UploadRequest) -> Dict[str, Any]:
+        """Build the videos.insert resource body (video metadata)"""
+        extra = upload_data.extra
+        return {
+            'snippet': {
+                'title': upload_data.title,
+                'description': upload_data.description,
+                'tags': extra.get('tags', []),
+                'categoryId': extra.get('category_id', '22')  # Default: People & Blogs
+            },
+            'status': {
+                'privacyStatus': extra.get('privacy', 'private'),  # private, public, unlisted
+                'selfDeclaredMadeForKids': extra.get('made_for_kids', False)
+            }
+        }
+    
+    def get_upload_status(self, upload_id: Union[str, List[str]]) -> Dict[str, Any]:
         """
-        Get status of a YouTube video
+        Get status of one or more YouTube videos
+        
+        Several IDs are fetched with one videos.list call per STATUS_BATCH_SIZE
+        IDs instead of one call per video.
         
         Args:
-            upload_id: YouTube video ID
+            upload_id: YouTube video ID, or a list of IDs
         
         Returns:
-            Dict containing video status information
+            Dict containing video status information; for a list of IDs,
+            a dict mapping each ID to its status dict
         """
         if not self.is_authenticated():
             return {'success': False, 'error': 'Not authenticated'}
         
+        video_ids = [upload_id] if isinstance(upload_id, str) else list(upload_id)
+        
         try:
-            response = self.youtube_service.videos().list(
-                part='status,snippet,processingDetails',
-                id=upload_id
-            ).execute()
+            videos = {}
+            for start in range(0, len(video_ids), self.STATUS_BATCH_SIZE):
+                response = self.youtube_service.videos().list(
+                    part='status,snippet,processingDetails',
+                    id=','.join(video_ids[start:start + self.STATUS_BATCH_SIZE])
+                ).execute()
+                for video in response.get('items', []):
+                    videos[video['id']] = video
             
-            if response['items']:
-                video = response['items'][0]
-                return {
-                    'success': True,
-                    'video_id': upload_id,
-                    'status': video['status'],
-                    'title': video['snippet']['title'],
-                    'processing_details': video.get('processingDetails', {}),
-                    'privacy_status': video['status']['privacyStatus']
-                }
-            else:
-                return {'success': False, 'error': 'Video not found'}
+            statuses = {}
+            for video_id in video_ids:
+                video = videos.get(video_id)
+                if video is None:
+                    statuses[video_id] = {'success': False, 'error': 'Video not found'}
+                else:
+                    statuses[video_id] = {
+                        'success': True,
+                        'video_id': video_id,
+                        'status': video['status'],
+                        'title': video['snippet']['title'],
+                        'processing_details': video.get('processingDetails', {}),
+                        'privacy_status': video['status']['privacyStatus']
+                    }
+            
+            return statuses[upload_id] if isinstance(upload_id, str) else statuses
                 
         except HttpError as e:
             return {'success': False, 'error': f"API error: {e}"}
     
-    def get_supported_formats(self) -> List[str]:
-        """Get YouTube supported video formats"""
-        return ['.mp4', '.mov', '.avi', '.wmv', '.flv', '.webm', '.mkv']
+    def _retry_delay(self, retry: int, retry_after: Optional[str] = None) -> float:
+        """
+        Seconds to wait before retry number `retry`
+        
+        Uses the server's Retry-After (in seconds) when it sent one, otherwise
+        exponential backoff with up to one second of jitter so concurrent
+        uploads don't retry in lockstep. Capped at MAX_RETRY_DELAY.
+        """
+        if retry_after:
+            try:
+                return min(self.MAX_RETRY_DELAY, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        return min(self.MAX_RETRY_DELAY, 2 ** retry + random.uniform(0, 1))
     
     def _resumable_upload(self, insert_request):
         """
         Handle resumable upload with retry logic
+        
+        Retryable errors are retried up to MAX_RETRIES times per chunk and
+        MAX_TOTAL_RETRIES times per upload; the same error twice in a row
+        (status and message) fails fast instead of waiting out the budget.
         """
         response = None
         error = None
+        last_error = None
         retry = 0
-        max_retries = 3
+        total_retries = 0
+        max_retries = self.MAX_RETRIES
+        
+        # Bound once, used for every chunk
+        logger = self.logger
+        next_chunk = insert_request.next_chunk
         
         while response is None:
+            retry_after = None
             try:
-                self.logger.info(f"Uploading video... (attempt {retry + 1}/{max_retries + 1})")
-                status, response = insert_request.next_chunk()
+                logger.info("Uploading video... (attempt %d/%d)", retry + 1, max_retries + 1)
+                status, response = next_chunk()
+                if status is not None:
+                    logger.info("Progress: %.1f%%", status.progress() * 100)
+                    # A chunk went through: the retry budget is per chunk
+                    retry = 0
+                    last_error = None
                 
                 if response is not None:
                     if 'id' in response:
-                        self.logger.info(f"Video uploaded successfully. Video ID: {response['id']}")
+                        logger.info("Video uploaded successfully. Video ID: %s", response['id'])
                     else:
-                        self.logger.error(f"Upload failed with unexpected response: {response}")
+                        logger.error("Upload failed with unexpected response: %s", response)
                         
             except HttpError as e:
-                if e.resp.status in [500, 502, 503, 504]:
-                    self.logger.warning(f"Retryable error {e.resp.status}: {e}")
+                if e.resp.status in self.RETRY_STATUSES:
+                    logger.warning("Retryable error %s: %s", e.resp.status, e)
                     error = f"Server error {e.resp.status}: {e}"
+                    retry_after = e.resp.get('retry-after')
                 else:
-                    self.logger.error(f"Non-retryable error: {e}")
+                    logger.error("Non-retryable error: %s", e)
                     raise e
                     
             except Exception as e:
-                self.logger.error(f"Unexpected error during upload: {e}")
+                logger.error("Unexpected error during upload: %s", e)
                 error = str(e)
                 break
             
             if error is not None:
+                if error == last_error:
+                    logger.error("Same error repeated, giving up: %s", error)
+                    break
+                last_error = error
                 retry += 1
-                if retry > max_retries:
-                    self.logger.error(f"Maximum retries exceeded. Last error: {error}")
+                total_retries += 1
+                if retry > max_retries or total_retries > self.MAX_TOTAL_RETRIES:
+                    logger.error("Maximum retries exceeded. Last error: %s", error)
                     break
                 else:
-                    import time
-                    sleep_time = 2 ** retry
-                    self.logger.info(f"Retrying in {sleep_time} seconds...")
+                    sleep_time = self._retry_delay(retry, retry_after)
+                    logger.info("Retrying in %.1f seconds...", sleep_time)
                     time.sleep(sleep_time)
                     error = None
         
@@ -3,34 +3,54 @@
 Test DigiViolin page access specifically
 """
 
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from concurrent.futures import ThreadPoolExecutor
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from core.json_io import read_json, write_json
+
+TOKEN_PATH = 'credentials/facebook/facebook_token.json'
 
 def test_digiviolin_page():
     """Test access to DigiViolin page"""
     
     # Load token
-    with open('credentials/facebook/facebook_token.json', 'r') as f:
-        token_data = json.load(f)
+    token_data = read_json(TOKEN_PATH)
     
     access_token = token_data['access_token']
     page_id = token_data['page_id']
     
+    # Both Graph calls share one keep-alive connection pool
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+    
     print("Testing DigiViolin Page Access")
     print("=" * 40)
     print(f"Page ID: {page_id}")
     print(f"Page URL: https://www.facebook.com/profile.php?id={page_id}")
     
+    token_params = {'access_token': access_token}
+    
+    # The two probes are independent: send them together, report them in order
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        page_future = executor.submit(
+            session.get,
+            f"https://graph.facebook.com/v23.0/{page_id}",
+            params={**token_params, 'fields': 'id,name,category,can_post'}
+        )
+        accounts_future = executor.submit(
+            session.get,
+            f"https://graph.facebook.com/v23.0/me/accounts",
+            params=token_params
+        )
+        response = page_future.result()
+        response2 = accounts_future.result()
+    
     # Test 1: Try to get page info directly
     print("\n1. Testing direct page access...")
-    response = requests.get(
-        f"https://graph.facebook.com/v23.0/{page_id}",
-        params={
-            'access_token': access_token,
-            'fields': 'id,name,category,can_post'
-        }
-    )
-    
     print(f"   Status: {response.status_code}")
     if response.status_code == 200:
         data = response.json()
@@ -51,11 +71,6 @@ def test_digiviolin_page():
     
     # Test 2: Try to get page access token
     print("\n2. Testing page access token retrieval...")
-    response2 = requests.get(
-        f"https://graph.facebook.com/v23.0/me/accounts",
-        params={'access_token': access_token}
-    )
-    
     if response2.status_code == 200:
         pages_data = response2.json()
         pages = pages_data.get('data', [])
@@ -72,8 +87,7 @@ def test_digiviolin_page():
             
             # Save the page access token
             token_data['page_access_token'] = digiviolin_page.get('access_token')
-            with open('credentials/facebook/facebook_token.json', 'w') as f:
-                json.dump(token_data, f, indent=2)
+            write_json(TOKEN_PATH, token_data)
             print("   Page access token saved to credentials file!")
             
         else:
@@ -3,6 +3,7 @@
 Test script for Facebook video posting functionality
 """
 
+import argparse
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -10,8 +11,14 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from core.platform_manager import PlatformManager
 
 
-def test_facebook_video_upload():
-    """Test Facebook video upload functionality"""
+def test_facebook_video_upload(video_paths=None):
+    """
+    Test Facebook video upload functionality
+    
+    Args:
+        video_paths: Videos to upload with one authenticated client
+                     (defaults to tutorial.mp4)
+    """
     print("Testing Facebook Video Upload Functionality")
     print("=" * 50)
     
@@ -45,42 +52,56 @@ def test_facebook_video_upload():
     
     print("+ Facebook authentication successful")
     
-    # Test video path
-    video_path = "tutorial.mp4"
-    if not os.path.exists(video_path):
-        print(f"X Test video file not found: {video_path}")
+    video_paths = video_paths or ["tutorial.mp4"]
+    missing = [path for path in video_paths if not os.path.exists(path)]
+    if missing:
+        print(f"X Test video file not found: {', '.join(missing)}")
         return False
     
-    print(f"Using test video: {video_path}")
+    print(f"Using test video(s): {', '.join(video_paths)}")
     
     # Test upload (dry run - comment out if you want to actually upload)
     print("\nTesting video upload process...")
     
-    # Test actual video upload
-    result = platform_manager.upload_video_to_platform(
-        'facebook',
-        video_path,
-        title="Test Video Upload - Facebook API",
-        description="This is a test video upload using the new Facebook resumable upload API implementation.",
-        hashtags=["test", "MultiPosti", "FacebookAPI"]
-    )
-    
-    if result['success']:
-        print(f"+ Video upload successful! Video ID: {result.get('video_id')}")
-        return True
-    else:
-        print(f"X Video upload failed: {result.get('error')}")
-        return False
-    print("+ All tests passed - Facebook platform is ready for video uploads!")
-    return True
+    # Upload every video through the same manager, so the token check and
+    # HTTP session from the authentication above are reused
+    results = []
+    try:
+        for video_path in video_paths:
+            result = platform_manager.upload_video_to_platform(
+                'facebook',
+                video_path,
+                title="Test Video Upload - Facebook API",
+                description="This is a test video upload using the new Facebook resumable upload API implementation.",
+                hashtags=["test", "MultiPosti", "FacebookAPI"]
+            )
+            results.append(result)
+            
+            if result['success']:
+                print(f"+ Video upload successful! ({video_path}) Video ID: {result.get('video_id')}")
+            else:
+                print(f"X Video upload failed ({video_path}): {result.get('error')}")
+    finally:
+        platform_manager.close()
+    
+    succeeded = sum(1 for result in results if result['success'])
+    if len(video_paths) > 1:
+        print(f"\n{succeeded}/{len(video_paths)} uploads succeeded")
+    
+    return succeeded == len(video_paths)
 
 
 def main():
     """Main test function"""
+    parser = argparse.ArgumentParser(description="Facebook video upload test")
+    parser.add_argument('--video-list', nargs='+', metavar='VIDEO',
+                        help='Videos to upload in one batch (default: tutorial.mp4)')
+    args = parser.parse_args()
+    
     print("MultiPosti - Facebook Video Upload Test")
     print("======================================")
     
-    success = test_facebook_video_upload()
+    success = test_facebook_video_upload(args.video_list)
     
     if success:
         print("\nAll tests completed successfully!")
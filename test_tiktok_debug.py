@@ -7,9 +7,37 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from core.platform_manager import PlatformManager
+import atexit
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from core.platform_manager import PlatformManager
+
+# Debug sessions keyed by access token, each with its Authorization header set once
+_sessions = {}
+
+
+def _close_sessions():
+    """Close the cached debug sessions at interpreter exit"""
+    for session in _sessions.values():
+        session.close()
+    _sessions.clear()
+
+
+atexit.register(_close_sessions)
+
+
+def _session(access_token: str) -> requests.Session:
+    """Keep-alive session that sends `access_token` as the Bearer token"""
+    session = _sessions.get(access_token)
+    if session is None:
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        session.headers.update({
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        })
+        _sessions[access_token] = session
+    return session
 
 
 def debug_tiktok_authentication():
@@ -45,16 +73,12 @@ def debug_tiktok_authentication():
         
         # Test API call directly
         print("\nTesting API call directly...")
-        headers = {
-            'Authorization': f'Bearer {token_data["access_token"]}',
-            'Content-Type': 'application/json'
-        }
+        session = _session(token_data["access_token"])
         
         # Test user info endpoint
         print("Calling /v2/user/info/...")
-        response = requests.get(
+        response = session.get(
             "https://open.tiktokapis.com/v2/user/info/",
-            headers=headers,
             params={'fields': 'open_id,username'},
             timeout=10
         )